@@ -0,0 +1,68 @@
+from discord.ext import vbu, tasks
+
+from cogs import utils
+
+
+class CacheMetrics(vbu.Cog[utils.types.Bot]):
+
+    def __init__(self, bot):
+        super().__init__(bot)
+        cache_config = bot.config.get('cache', {})
+        self.cache_metrics_loop.change_interval(
+            seconds=cache_config.get('metrics_interval', 60),
+        )
+        self.cache_metrics_loop.start()
+
+    def cog_unload(self):
+        self.cache_metrics_loop.cancel()
+
+    def get_cache_stats(self) -> dict[str, dict[str, int | float]]:
+        """
+        Get the counters for each of the bot's caches, by cache name.
+        """
+
+        caches = {
+            "user_plants": utils.UserPlant.cache.stats(),
+            "user_info": utils.UserInfo.cache.stats(),
+            "premium": utils.UserInfo.premium_cache.stats(),
+            "pot_sprites": utils.PlantDisplayUtils.pot_sprite_cache.stats(),
+            "plant_images": utils.PlantDisplayUtils.plant_image_cache.stats(),
+            "rendered_plants": utils.PlantDisplayUtils.rendered_plant_cache.stats(),
+            "plant_sprites": utils.PlantDisplayUtils.plant_sprite_cache.stats(),
+        }
+        water_commands = self.bot.get_cog("WaterCommands")
+        if water_commands:
+            caches["votes"] = water_commands.vote_cache.stats()  # pyright: ignore
+        return caches
+
+    @tasks.loop(seconds=60)
+    async def cache_metrics_loop(self):
+        """
+        Loop to send the counters for each cache and image encoder to
+        statsd.
+        """
+
+        async with vbu.Stats() as stats:
+            for cache_name, cache_stats in self.get_cache_stats().items():
+                for stat_name, value in cache_stats.items():
+                    stats.gauge(
+                        f"cache.{stat_name}",
+                        value=value,
+                        tags={"cache": cache_name},
+                    )
+            for encoder_name, encoder_stats in utils.ImageEncoder.all_stats().items():
+                for stat_name, value in encoder_stats.items():
+                    stats.gauge(
+                        f"image_encoder.{stat_name}",
+                        value=value,
+                        tags={"encoder": encoder_name},
+                    )
+
+    @cache_metrics_loop.before_loop
+    async def before_cache_metrics_loop(self):
+        await self.bot.wait_until_ready()
+
+
+def setup(bot: utils.types.Bot):
+    x = CacheMetrics(bot)
+    bot.add_cog(x)
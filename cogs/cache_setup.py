@@ -36,6 +36,44 @@ def setup(bot: utils.types.Bot):
         for i in available_plants
     }
 
+    # Set up the image caches
+    render_config = bot.config.get('render', {})
+    utils.PlantDisplayUtils.pot_sprite_cache.resize(
+        render_config.get('pot_sprite_cache_size', 16) * 1024 * 1024
+    )
+    utils.PlantDisplayUtils.plant_image_cache.resize(
+        render_config.get('plant_image_cache_size', 32) * 1024 * 1024
+    )
+    utils.PlantDisplayUtils.rendered_plant_cache.resize(
+        render_config.get('rendered_plant_cache_size', 64) * 1024 * 1024
+    )
+    utils.PlantDisplayUtils.plant_sprite_cache.resize(
+        render_config.get('plant_sprite_cache_size', 16) * 1024 * 1024
+    )
+    rendered_plant_directory = render_config.get('rendered_plant_directory')
+    if rendered_plant_directory:
+        os.makedirs(rendered_plant_directory, exist_ok=True)
+    utils.PlantDisplayUtils.rendered_plant_directory = (
+        rendered_plant_directory or None
+    )
+    for name in plant_names:
+        utils.PlantDisplayUtils.index_plant_images(name)
+    if render_config.get('precompute_pot_sprites', False):
+        pot_types = [
+            i.strip(os.sep).split(os.sep)[-1]
+            for i in glob.glob("images/pots/[!_]*/")
+        ]
+        utils.PlantDisplayUtils.precompute_pot_sprites(
+            pot_types,
+            [0, *(i.soil_hue for i in bot.plants.values())],
+        )
+
+    # Set up the user state caches
+    cache_config = bot.config.get('cache', {})
+    for user_state_cache in (utils.UserPlant.cache, utils.UserInfo.cache):
+        user_state_cache.ttl = cache_config.get('user_state_ttl', 60)
+        user_state_cache.resize(cache_config.get('user_state_cache_size', 10_000))
+
     # Add the items
     bot.items = {
         "revival_token": utils.Item(
@@ -72,3 +110,11 @@ def teardown(bot: utils.types.Bot):
         bot.items.clear()
     except AttributeError:
         pass
+    utils.PlantDisplayUtils.pot_sprite_cache.clear()
+    utils.PlantDisplayUtils.plant_image_cache.clear()
+    utils.PlantDisplayUtils.rendered_plant_cache.clear()
+    utils.PlantDisplayUtils.plant_sprite_cache.clear()
+    utils.UserPlant.cache.clear()
+    utils.UserInfo.cache.clear()
+    utils.UserInfo.premium_cache.clear()
+    asyncio.create_task(utils.UserInfo.premium_cache.close())
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import io
 import json
 import random
-from typing import TYPE_CHECKING, Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
 import discord
 from discord.ext import commands, vbu
@@ -10,10 +12,6 @@ from discord.ext import commands, vbu
 from cogs import utils
 
 if TYPE_CHECKING:
-    import io
-
-    from PIL import Image
-
     from .plant_display_utils import PlantDisplayUtils
 
 
@@ -42,6 +40,20 @@ class HerbiaryCommands(vbu.Cog[utils.types.Bot]):
         super().__init__(bot)
         self._artist_info: Dict[str, utils.types.ArtistInfo] = {}
 
+        # Set up the store of pre-rendered stage gifs
+        render_config = bot.config.get('render', {})
+        self.stage_gifs = utils.StageGifStore.with_hue_count(
+            render_config.get('herbiary_gif_directory') or "cache/herbiary",
+            render_config.get('herbiary_gif_hue_count', 12),
+        )
+        self._bake_task = None
+        if render_config.get('bake_herbiary_gifs', False):
+            self._bake_task = bot.loop.create_task(self.bake_stage_gifs())
+
+    def cog_unload(self):
+        if self._bake_task:
+            self._bake_task.cancel()
+
     @property
     def artist_info(self) -> Dict[str, utils.types.ArtistInfo]:
         """
@@ -56,6 +68,71 @@ class HerbiaryCommands(vbu.Cog[utils.types.Bot]):
         self._artist_info = data
         return data
 
+    @property
+    def display_utils(self) -> PlantDisplayUtils:
+        display_utils: Optional[PlantDisplayUtils]
+        display_utils = self.bot.get_cog("PlantDisplayUtils")  # pyright: ignore
+        assert display_utils, "PlantDisplayUtils not loaded"
+        return display_utils
+
+    async def get_stage_gif(
+            self,
+            plant: utils.Plant,
+            pot_hue: int) -> io.BytesIO:
+        """
+        Get a gif of each of the display stages of a plant, reading it from
+        the stage gif store if it's already been made and making it
+        otherwise. The store's file reads and writes are run off of the
+        event loop.
+        """
+
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(
+            None,
+            self.stage_gifs.read,
+            plant,
+            "clay",
+            pot_hue,
+        )
+        if data is None:
+            gif = await self.display_utils.render_stage_gif(
+                plant.name,
+                "clay",
+                pot_hue,
+            )
+            data = gif.getvalue()
+            await loop.run_in_executor(
+                None,
+                self.stage_gifs.write,
+                plant,
+                "clay",
+                pot_hue,
+                data,
+            )
+        return io.BytesIO(data)
+
+    async def bake_stage_gifs(self) -> None:
+        """
+        Make all of the stage gifs that are missing from the store.
+        """
+
+        await self.bot.wait_until_ready()
+        plants = [
+            i
+            for i in self.bot.plants.values()
+            if i.visible
+        ]
+        missing = await asyncio.get_running_loop().run_in_executor(
+            None,
+            self.stage_gifs.get_missing,
+            plants,
+            "clay",
+        )
+        self.logger.info(f"Baking {len(missing)} herbiary stage gifs")
+        for plant, pot_hue in missing:
+            await self.get_stage_gif(plant, pot_hue)
+        self.logger.info("Finished baking herbiary stage gifs")
+
     @commands.command(
         application_command_meta=commands.ApplicationCommandMeta(
             name_localizations={
@@ -144,26 +221,10 @@ class HerbiaryCommands(vbu.Cog[utils.types.Bot]):
             embed.description = '\n'.join(description_list)
             embed.set_image("attachment://plant.gif")
             ctx.bot.set_footer_from_config(embed)
-        display_vbu: Optional[PlantDisplayUtils]
-        display_vbu = self.bot.get_cog("PlantDisplayUtils")  # pyright: ignore
-        assert display_vbu, "PlantDisplayUtils not loaded"
-
-        # Make a gif of the stages
-        pot_hue: int = random.randint(0, 360)  # Get a random colour
-        display_levels: List[int] = []  # All display stages
-        added_display_stages: List[int] = []  # All unique display stages
-        for i, o in plant_object.nourishment_display_levels.items():
-            if o not in added_display_stages:
-                display_levels.insert(0, int(i))
-                added_display_stages.append(o)
-        gif_frames: List[Image.Image] = [
-            display_vbu.get_plant_image(plant_object.name, i, "clay", pot_hue)
-            for i in [0, *display_levels]
-        ]
-        plant_image_bytes: io.BytesIO = display_vbu.gif_to_bytes(
-            *gif_frames[::-1],
-            duration=1_000,
-        )
+
+        # Get a gif of the stages
+        pot_hue: int = random.choice(self.stage_gifs.hues)  # Get a random colour
+        plant_image_bytes = await self.get_stage_gif(plant_object, pot_hue)
 
         # And send image
         return await ctx.interaction.response.send_message(
@@ -1,5 +1,5 @@
-import collections
-from datetime import timedelta
+from datetime import datetime as dt, timedelta
+from typing import Optional
 
 from discord.ext import vbu, tasks
 
@@ -8,64 +8,117 @@ from cogs import utils
 
 class PlantDeathTimeout(vbu.Cog[utils.types.Bot]):
 
+    MAX_SLEEP = timedelta(minutes=10)
+    """
+    The longest we'll go without checking for dead plants, in case a plant
+    was changed by something that doesn't reschedule it (such as another
+    process).
+    """
+
     def __init__(self, bot):
         super().__init__(bot)
+        self.death_scheduler: utils.DeadlineScheduler[str]
+        self.death_scheduler = utils.DeadlineScheduler()
+        utils.UserPlant.listeners.append(self.schedule_plant)
         self.plant_death_timeout_loop.start()
 
     def cog_unload(self):
-        self.plant_death_timeout_loop.stop()
+        utils.UserPlant.listeners.remove(self.schedule_plant)
+        self.plant_death_timeout_loop.cancel()
 
-    @staticmethod
-    async def kill_plants(
-            db: vbu.Database) -> list[utils.types.PlantLevelsRow]:
+    def schedule_plant(
+            self,
+            plant: utils.UserPlant,
+            deleted: bool = False) -> None:
         """
-        Kill any dead plants in the database.
+        Update when a plant is due to die after it's been changed.
         """
 
-        return await db.call(
+        if deleted or plant.nourishment <= 0 or plant.immortal:
+            self.death_scheduler.unschedule(plant.id)
+        else:
+            self.death_scheduler.schedule(
+                plant.id,
+                plant.last_water_time + utils.constants.DEATH_TIMEOUT,
+            )
+
+    async def load_schedule(
+            self,
+            db: vbu.Database) -> None:
+        """
+        Schedule the death of every live plant in the database.
+        """
+
+        rows = await db.call(
             """
-            UPDATE
+            SELECT
+                id,
+                last_water_time
+            FROM
                 plant_levels
-            SET
-                plant_nourishment = -plant_levels.plant_nourishment
             WHERE
                 plant_nourishment > 0
-            AND
-                last_water_time + $1 < TIMEZONE('UTC', NOW())
             AND
                 immortal = FALSE
-            RETURNING
-                *
             """,
-            utils.constants.DEATH_TIMEOUT,
-            type=utils.types.PlantLevelsRow,
         )
+        self.death_scheduler.replace(
+            (str(r['id']), r['last_water_time'] + utils.constants.DEATH_TIMEOUT)
+            for r in rows
+        )
+        self.logger.info(f"Scheduled the deaths of {len(rows)} plants")
 
     @staticmethod
-    async def update_max_plant_lifetime(
-            db: vbu.Database):
+    async def kill_plants(
+            db: vbu.Database,
+            now: Optional[dt] = None) -> list[int]:
         """
-        Set the maximum plant lifetime.
+        Kill any dead plants in the database, adding them to their owners'
+        death counts and max plant lifetimes in the same statement.
+
+        Only the plants that die are touched, so this stays cheap no matter
+        how many plants are in the table - the cutoff time is worked out
+        beforehand so that the search can use the
+        ``plant_levels_mortal_water_time_idx`` index. A plant's lifetime is
+        counted up until the point that it died.
+
+        Returns
+        -------
+        list[int]
+            The IDs of the users who had plants die.
         """
 
-        await db.call(
+        rows = await db.call(
             """
+            WITH killed_plants AS (
+                UPDATE
+                    plant_levels
+                SET
+                    plant_nourishment = -plant_levels.plant_nourishment
+                WHERE
+                    plant_nourishment > 0
+                AND
+                    immortal = FALSE
+                AND
+                    last_water_time <= $1
+                RETURNING
+                    user_id,
+                    last_water_time + $2 - plant_adoption_time AS lifetime
+            )
             INSERT INTO
                 user_achievement_counts
                 (
                     user_id,
+                    death_count,
                     max_plant_lifetime
                 )
             (
                 SELECT
                     user_id,
-                    MAX(TIMEZONE('UTC', NOW()) - plant_adoption_time)
+                    COUNT(*),
+                    MAX(lifetime)
                 FROM
-                    plant_levels
-                WHERE
-                    plant_levels.plant_nourishment > 0
-                AND
-                    immortal=FALSE
+                    killed_plants
                 GROUP BY
                     user_id
             )
@@ -73,45 +126,39 @@ class PlantDeathTimeout(vbu.Cog[utils.types.Bot]):
                 (user_id)
             DO UPDATE
             SET
+                death_count = user_achievement_counts.death_count + excluded.death_count,
                 max_plant_lifetime = GREATEST(
                     user_achievement_counts.max_plant_lifetime,
                     excluded.max_plant_lifetime
                 )
-            WHERE
-                user_achievement_counts.user_id = excluded.user_id
+            RETURNING
+                user_id
             """,
+            (now or dt.utcnow()) - utils.constants.DEATH_TIMEOUT,
+            utils.constants.DEATH_TIMEOUT,
         )
+        return [r['user_id'] for r in rows]
 
-    @tasks.loop(minutes=1)
+    @tasks.loop(seconds=0)
     async def plant_death_timeout_loop(self):
         """
-        Loop to see if we should kill off any plants that
-        may have been timed out.
+        Loop to kill off plants as they time out. This sleeps until the next
+        plant is due to die rather than polling.
         """
 
+        await self.death_scheduler.wait(self.MAX_SLEEP)
+        now = dt.utcnow()
         async with vbu.Database() as db:
-
-            # Kill any dead plants
-            new_dead_plants = await self.kill_plants(db)
-
-            # Update plant death count
-            user_death_count: dict[int, int] = collections.defaultdict(int)
-            for plant in new_dead_plants:
-                user_death_count[plant['user_id']] += 1
-            for user_id, death_count in user_death_count.items():
-                await utils.achievements.update_achievement_count(
-                    db,
-                    user_id,
-                    utils.achievements.Achievement.deaths,
-                    death_count,
-                )
-
-            # Update max plant lifetime
-            await self.update_max_plant_lifetime(db)
+            user_ids = await self.kill_plants(db, now)
+        for user_id in user_ids:
+            utils.UserPlant.cache.invalidate(user_id)
+        self.death_scheduler.pop_due(now)
 
     @plant_death_timeout_loop.before_loop
     async def before_plant_death_timeout_loop(self):
         await self.bot.wait_until_ready()
+        async with vbu.Database() as db:
+            await self.load_schedule(db)
 
 
 def setup(bot: utils.types.Bot):
@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime as dt
+
+import discord
+from discord.ext import vbu, tasks
+
+from cogs import utils
+
+
+class PlantDeathNotifications(vbu.Cog[utils.types.Bot]):
+
+    def __init__(self, bot):
+        super().__init__(bot)
+        notification_config = bot.config.get('notifications', {})
+        self.batch_size: int = notification_config.get('batch_size', 1_000)
+
+        # DMs are sent from a queue by a few workers, so that a big batch of
+        # warnings is spread out rather than hitting Discord all at once
+        self.notification_queue: asyncio.Queue[tuple[int, list[str]]]
+        self.notification_queue = asyncio.Queue(
+            notification_config.get('max_queue_size', 10_000),
+        )
+        self.rate_limiter = utils.RateLimiter(
+            notification_config.get('dms_per_second', 5),
+        )
+        self._workers: list[asyncio.Task] = []
+        if notification_config.get('enabled', True):
+            self._workers = [
+                bot.loop.create_task(self.notification_worker())
+                for _ in range(notification_config.get('concurrency', 4))
+            ]
+            self.notification_loop.start()
+
+    def cog_unload(self):
+        self.notification_loop.cancel()
+        for task in self._workers:
+            task.cancel()
+
+    async def mark_dying_plants(
+            self,
+            db: vbu.Database) -> list[tuple[int, list[str]]]:
+        """
+        Find the plants that have just entered the warning window before
+        they die, marking them as notified.
+
+        Returns
+        -------
+        list[tuple[int, list[str]]]
+            The IDs of the users that need to be warned, along with the names
+            of their plants that are dying.
+        """
+
+        now = dt.utcnow()
+        rows = await db.call(
+            """
+            WITH warned_plants AS (
+                UPDATE
+                    plant_levels
+                SET
+                    notification_sent = TRUE
+                WHERE
+                    id IN (
+                        SELECT
+                            id
+                        FROM
+                            plant_levels
+                        WHERE
+                            plant_nourishment > 0
+                        AND
+                            immortal = FALSE
+                        AND
+                            notification_sent = FALSE
+                        AND
+                            last_water_time <= $1
+                        AND
+                            last_water_time > $2
+                        ORDER BY
+                            last_water_time ASC
+                        LIMIT
+                            $3
+                        FOR UPDATE SKIP LOCKED
+                    )
+                RETURNING
+                    user_id,
+                    plant_name
+            )
+            SELECT
+                user_id,
+                ARRAY_AGG(plant_name::TEXT ORDER BY plant_name) AS plant_names
+            FROM
+                warned_plants
+            GROUP BY
+                user_id
+            """,
+            now - (utils.constants.DEATH_TIMEOUT - utils.constants.NOTIFICATION_TIME),
+            now - utils.constants.DEATH_TIMEOUT,
+            self.batch_size,
+        )
+        return [
+            (r['user_id'], r['plant_names'])
+            for r in rows
+        ]
+
+    async def send_notification(
+            self,
+            user_id: int,
+            plant_names: list[str]) -> None:
+        """
+        DM a user to tell them that their plants are about to die.
+        """
+
+        user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+        water_command_mention = self.bot.get_command("water").mention  # pyright: ignore
+
+        # DMs don't come with a locale, so these use the default one
+        translation = vbu.translation(discord.Locale.american_english, "flower")
+        message = translation.ngettext(
+            (
+                "Your plant **{plant_name}** is going to die soon! Water it "
+                "with {water_command_mention} to keep it alive."
+            ),
+            (
+                "These plants of yours are going to die soon!\n{plant_list}\n"
+                "Water them with {water_command_mention} to keep them alive."
+            ),
+            len(plant_names),
+        ).format(
+            plant_name=plant_names[0],
+            plant_list="\n".join(f"\N{BULLET} **{i}**" for i in plant_names),
+            water_command_mention=water_command_mention,
+        )
+        await user.send(message)
+
+    async def notification_worker(self):
+        """
+        Send queued notifications until the cog is unloaded.
+        """
+
+        await self.bot.wait_until_ready()
+        while True:
+            user_id, plant_names = await self.notification_queue.get()
+            try:
+                async with self.rate_limiter:
+                    await self.send_notification(user_id, plant_names)
+            except (discord.Forbidden, discord.NotFound):
+                pass  # Their DMs are closed, or we can't find them
+            except Exception:
+                self.logger.exception(
+                    f"Failed to send a death notification to {user_id}"
+                )
+            finally:
+                self.notification_queue.task_done()
+
+    @tasks.loop(minutes=1)
+    async def notification_loop(self):
+        """
+        Loop to queue up warnings for plants that are about to die.
+        """
+
+        while True:
+            async with vbu.Database() as db:
+                notifications = await self.mark_dying_plants(db)
+            for notification in notifications:
+                utils.UserPlant.cache.invalidate(notification[0])
+                await self.notification_queue.put(notification)
+
+            # Keep going if we hit the batch size - there are probably more
+            plant_count = sum(len(i[1]) for i in notifications)
+            if plant_count < self.batch_size:
+                break
+
+    @notification_loop.before_loop
+    async def before_notification_loop(self):
+        await self.bot.wait_until_ready()
+
+
+def setup(bot: utils.types.Bot):
+    x = PlantDeathNotifications(bot)
+    bot.add_cog(x)
@@ -1,28 +1,174 @@
 from __future__ import annotations
 
+import asyncio
 import io
 import random
-from typing import Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
 
 from PIL import Image, ImageOps
 import numpy as np
-import colorsys
 from discord.ext import vbu
 
 from cogs import utils
 
 
+T = TypeVar("T")
+
+
 class PlantDisplayUtils(vbu.Cog[utils.types.Bot]):
 
     PLANT_SCALE_SIZE = 5
 
-    rgb_to_hsv = np.vectorize(colorsys.rgb_to_hsv)
-    hsv_to_rgb = np.vectorize(colorsys.hsv_to_rgb)
+    rgb_to_hsv = staticmethod(utils.colour.rgb_to_hsv)
+    hsv_to_rgb = staticmethod(utils.colour.hsv_to_rgb)
 
     def __init__(self, bot):
         super().__init__(bot)
         self._available_plants = None
 
+        # Set up the executor that all of our image work is run on
+        render_config = bot.config.get('render', {})
+        max_workers: Optional[int] = render_config.get('max_workers') or None
+        self.render_executor: Executor
+        self.renders_in_processes = render_config.get('executor', 'thread') == 'process'
+        if self.renders_in_processes:
+            self.render_executor = ProcessPoolExecutor(max_workers)
+        else:
+            self.render_executor = ThreadPoolExecutor(
+                max_workers,
+                thread_name_prefix="render",
+            )
+        self._render_slots = asyncio.Semaphore(
+            render_config.get('max_queue_depth', 32),
+        )
+
+        # Work out which encoders we're using for each place images are sent
+        self.discord_image_encoder = utils.ImageEncoder.get(
+            render_config.get('discord_image_encoding'),
+        )
+        self.website_image_encoder = utils.ImageEncoder.get(
+            render_config.get('website_image_encoding'),
+        )
+
+    def cog_unload(self):
+        self.render_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run_in_renderer(
+            self,
+            func: Callable[..., T],
+            *args: Any) -> T:
+        """
+        Run a blocking image function on the render executor. If the
+        executor's queue is full, this waits for a slot to free up before
+        submitting. Any images encoded in a render process are added to this
+        process' encoder counts.
+        """
+
+        async with self._render_slots:
+            loop = asyncio.get_running_loop()
+            if not self.renders_in_processes:
+                return await loop.run_in_executor(
+                    self.render_executor,
+                    func,
+                    *args,
+                )
+            result, counts = await loop.run_in_executor(
+                self.render_executor,
+                utils.ImageEncoder.run_counted,
+                func,
+                *args,
+            )
+        for name, encoder_counts in counts.items():
+            utils.ImageEncoder.get(name).add_counts(*encoder_counts)
+        return result
+
+    async def render_plant(
+            self,
+            plant_type: Optional[str],
+            plant_nourishment: int,
+            pot_type: str,
+            pot_hue: int,
+            crop_image: bool = True,
+            scale: Optional[int] = None,
+            encoding: Optional[str] = None) -> io.BytesIO:
+        """
+        Get a BytesIO object containing the encoded image of a given plant/pot
+        item, rendering it off of the event loop if it isn't already cached.
+        A ``scale`` of ``1`` gives the plant at its native resolution.
+        """
+
+        plant = self.bot.plants[plant_type] if plant_type else None
+        key = utils.PlantDisplayUtils.get_render_key(
+            plant,
+            plant_nourishment,
+            pot_type,
+            pot_hue,
+            crop_image,
+            scale,
+            encoding,
+        )
+        data = utils.PlantDisplayUtils.rendered_plant_cache.get(key)
+        if data is None:
+            image_bytes = await self.run_in_renderer(
+                utils.PlantDisplayUtils.get_plant_image_bytes,
+                plant,
+                plant_nourishment,
+                pot_type,
+                pot_hue,
+                crop_image,
+                scale,
+                encoding,
+            )
+            data = image_bytes.getvalue()
+
+            # Caches in the render workers aren't shared with this process
+            # when a process pool is used, so store the result here too
+            utils.PlantDisplayUtils.rendered_plant_cache.set(key, data)
+        return io.BytesIO(data)
+
+    async def render_garden(
+            self,
+            plants: list[utils.types.UserPlantDisplayData],
+            encoding: Optional[str] = None) -> io.BytesIO:
+        """
+        Get a BytesIO object containing the encoded image of a set of plants
+        side by side, rendered off of the event loop.
+        """
+
+        garden = [
+            (
+                self.bot.plants[i['plant_type']] if i['plant_type'] else None,
+                i['plant_nourishment'],
+                i['pot_type'],
+                i['pot_hue'],
+            )
+            for i in plants
+        ]
+        return await self.run_in_renderer(
+            utils.PlantDisplayUtils.get_garden_image_bytes,
+            garden,
+            True,
+            encoding,
+        )
+
+    async def render_stage_gif(
+            self,
+            plant_type: str,
+            pot_type: str,
+            pot_hue: int) -> io.BytesIO:
+        """
+        Get a BytesIO object containing a gif of each of the display stages
+        of a plant, rendered off of the event loop.
+        """
+
+        return await self.run_in_renderer(
+            utils.PlantDisplayUtils.get_stage_gif_bytes,
+            self.bot.plants[plant_type],
+            pot_type,
+            pot_hue,
+        )
+
     @staticmethod
     def sort_plant_rows(rows: list[utils.types.PlantLevelsRow]) -> list[utils.types.PlantLevelsRow]:
         return sorted(
@@ -120,132 +266,21 @@ class PlantDisplayUtils(vbu.Cog[utils.types.Bot]):
             plant_nourishment: int,
             pot_type: str,
             pot_hue: int,
-            crop_image: bool = True) -> Image.Image:
+            crop_image: bool = True,
+            scale: Optional[int] = None) -> Image.Image:
         """
         Get a BytesIO object containing the binary data of a given plant/pot item.
         """
 
-        # See if the plant is dead or not
-        plant_is_dead = False
-        plant_nourishment = int(plant_nourishment)
-        if plant_nourishment < 0:
-            plant_is_dead = True
-            plant_nourishment = -plant_nourishment
-        file_folder = {False: "alive", True: "dead"}[plant_is_dead]
-
-        # Set up the variables we need for later
-        plant_image: Optional[Image.Image] = None
-        plant_overlay_image: Optional[Image.Image] = None
-        plant_underlay_image: Optional[Image.Image] = None
-
-        # Work out the
-        if plant_nourishment != 0 and plant_type is not None:
-            plant_level = (
-                self.bot.plants[plant_type]
-                .get_nourishment_display_level(plant_nourishment)
-            )
-            plant_image = Image.open(
-                (
-                    f"images/plants/{plant_type}/{file_folder}"
-                    f"/{plant_level}.png"
-                )
-            ).convert("RGBA")
-            try:
-                plant_overlay_image = Image.open(
-                    (
-                        f"images/plants/{plant_type}/{file_folder}"
-                        f"/{plant_level}_overlay.png"
-                    )
-                ).convert("RGBA")
-            except FileNotFoundError:
-                pass
-            try:
-                plant_underlay_image = Image.open(
-                    (
-                        f"images/plants/{plant_type}/{file_folder}"
-                        f"/{plant_level}_underlay.png"
-                    )
-                ).convert("RGBA")
-            except FileNotFoundError:
-                pass
-
-        """
-        Plants are drawn in the following layer order:
-            Plant underlay
-            Pot back
-            Pot soil
-            Plant image
-            Pot front
-            Plant overlay
-        """
-
-        # Start with the underlay image, if it exists
-        image = None
-        if plant_underlay_image:
-            image = plant_underlay_image
-
-        # Paste the bot pack that we want onto the image
-        offset = (0, 0)  # The offset for the plant pot being pasted into the image
-        pot_back = (
-            Image.open(f"images/pots/{pot_type}/back.png")
-            .convert("RGBA")
-        )
-        pot_back = self.shift_image_hue(pot_back, pot_hue)
-        if plant_image:
-            # Work out the offset for the pot based on the image size
-            # This works with or without an underlay
-            offset = (
-                int((plant_image.size[0] - pot_back.size[0]) / 2),
-                plant_image.size[1] - pot_back.size[1],
-            )
-            if image is None:
-                image = Image.new(pot_back.mode, plant_image.size)
-            image.paste(pot_back, offset, pot_back)
-        else:
-            # There was no plant image and there was no underlay
-            image = pot_back
-
-        # Paste the soil that we want onto the image
-        pot_soil = (
-            Image.open(f"images/pots/{pot_type}/soil.png")
-            .convert("RGBA")
-        )
-        if plant_type:
-            pot_soil = self.shift_image_hue(
-                pot_soil,
-                self.bot.plants[plant_type].soil_hue,
-            )
-        else:
-            pot_soil = self.shift_image_hue(pot_soil, 0)
-        image.paste(pot_soil, offset, pot_soil)
-
-        # Paste the plant onto the image
-        if plant_nourishment != 0 and plant_image:
-            image.paste(plant_image, (0, 0), plant_image)
-
-        # Paste the pot foreground onto the image
-        pot_foreground = (
-            Image.open(f"images/pots/{pot_type}/front.png")
-            .convert("RGBA")
-        )
-        pot_foreground = self.shift_image_hue(pot_foreground, pot_hue)
-        image.paste(pot_foreground, offset, pot_foreground)
-
-        # And see if we have a pot overlay to paste
-        if plant_overlay_image:
-            image.paste(plant_overlay_image, (0, 0), plant_overlay_image)
-
-        # Read the bytes
-        image = image.resize(
-            (
-                image.size[0] * self.PLANT_SCALE_SIZE,
-                image.size[1] * self.PLANT_SCALE_SIZE,
-            ),
-            Image.NEAREST,
+        plant = self.bot.plants[plant_type] if plant_type else None
+        return utils.PlantDisplayUtils.get_plant_image(
+            plant,
+            plant_nourishment,
+            pot_type,
+            pot_hue,
+            crop_image=crop_image,
+            scale=scale,
         )
-        if crop_image:
-            return self.crop_image_to_content(image)
-        return image
 
     @classmethod
     def compile_plant_images(
@@ -332,7 +367,7 @@ class PlantDisplayUtils(vbu.Cog[utils.types.Bot]):
             i.size[0] + (spacer_pixels * cls.PLANT_SCALE_SIZE)
             for i in plants
         ])
-        pot_image = Image.open("images/pots/clay/front.png").convert("RGBA")
+        pot_image = utils.PlantDisplayUtils.get_pot_layer_source("clay", "front")
         pot_width = pot_image.size[0] * cls.PLANT_SCALE_SIZE
 
         # Work out which of our images to flip
@@ -120,6 +120,7 @@ class PlantManagement(vbu.Cog[utils.types.Bot]):
                 db,
                 ctx.author.id,
                 plant,
+                cached=False,
             )
             if not plant_object:
                 return await ctx.send(
@@ -133,6 +134,7 @@ class PlantManagement(vbu.Cog[utils.types.Bot]):
                 db,
                 ctx.author.id,
                 new_name,
+                cached=False,
             )
             if plant_with_name:
                 return await ctx.interaction.response.send_message(
@@ -256,6 +258,7 @@ class PlantManagement(vbu.Cog[utils.types.Bot]):
                 db,
                 interaction.user.id,
                 plant,
+                cached=False,
             )
             if not plant_object:
                 return await interaction.response.edit_message(
@@ -403,6 +406,7 @@ class PlantManagement(vbu.Cog[utils.types.Bot]):
                 db,
                 interaction.user.id,
                 plant_name,
+                cached=False,
             )
             if not plant_object:
                 return await interaction.response.edit_message(
@@ -419,12 +423,20 @@ class PlantManagement(vbu.Cog[utils.types.Bot]):
                     components=None,
                 )
 
-            # Make sure the user still has the right amount of immortal plant juice
-            user_inventory = await utils.UserInventory.fetch_by_id(
-                db,
-                interaction.user.id,
-            )
-            if user_inventory.get("immortal_plant_juice").amount < 1:
+            # Immortalize the plant - this only goes through if the user
+            # still has some immortal plant juice to use
+            async with utils.UserStateCache.transaction(db) as trans:
+                used = await utils.UserInventory.use_item(
+                    trans,
+                    interaction.user.id,
+                    "immortal_plant_juice",
+                )
+                if used:
+                    await plant_object.update(
+                        trans,
+                        immortal=True,
+                    )
+            if not used:
                 shop_command_mention: str = self.bot.get_command("shop").mention  # pyright: ignore
                 return await interaction.response.edit_message(
                     content=_(
@@ -433,17 +445,6 @@ class PlantManagement(vbu.Cog[utils.types.Bot]):
                     ).format(shop_command_mention=shop_command_mention),
                     components=None,
                 )
-
-            # Immortalize the plant
-            async with db.transaction() as trans:
-                await plant_object.update(
-                    trans,
-                    immortal=True,
-                )
-                await user_inventory.update(
-                    trans,
-                    immortal_plant_juice=-1,
-                )
             await utils.update_achievement_count(
                 db,
                 interaction.user.id,
@@ -565,6 +566,7 @@ class PlantManagement(vbu.Cog[utils.types.Bot]):
                 db,
                 interaction.user.id,
                 plant,
+                cached=False,
             )
             if not plant_object:
                 return await interaction.response.edit_message(
@@ -581,12 +583,20 @@ class PlantManagement(vbu.Cog[utils.types.Bot]):
                     components=None,
                 )
 
-            # Make sure the user still has a revival token
-            user_inventory = await utils.UserInventory.fetch_by_id(
-                db,
-                interaction.user.id,
-            )
-            if user_inventory.get("revival_token").amount < 1:
+            # Revive the plant - this only goes through if the user still has
+            # a revival token to use
+            async with utils.UserStateCache.transaction(db) as trans:
+                used = await utils.UserInventory.use_item(
+                    trans,
+                    interaction.user.id,
+                    "revival_token",
+                )
+                if used:
+                    await plant_object.update(
+                        trans,
+                        nourishment=0,
+                    )
+            if not used:
                 shop_command_mention: str = self.bot.get_command("shop").mention
                 return await interaction.response.edit_message(
                     content=_(
@@ -595,17 +605,6 @@ class PlantManagement(vbu.Cog[utils.types.Bot]):
                     ).format(shop_command_mention=shop_command_mention),
                     components=None,
                 )
-
-            # Revive the plant
-            async with db.transaction() as trans:
-                await plant_object.update(
-                    trans,
-                    nourishment=0,
-                )
-                await user_inventory.update(
-                    trans,
-                    revival_token=-1,
-                )
             await utils.update_achievement_count(
                 db,
                 interaction.user.id,
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import discord
 from discord.ext import vbu, commands
@@ -6,7 +6,7 @@ from discord.ext import vbu, commands
 from cogs import utils
 
 if TYPE_CHECKING:
-    from PIL import Image
+    from .plant_display_utils import PlantDisplayUtils
 
 
 if __debug__:
@@ -161,21 +161,25 @@ class PlantShowCommands(vbu.Cog[utils.types.Bot]):
         await interaction.response.defer()
 
         # Get our image
-        image = utils.PlantDisplayUtils.get_plant_image(
-            user_plant.plant,
+        display_utils: Optional[PlantDisplayUtils]
+        display_utils = self.bot.get_cog("PlantDisplayUtils")  # pyright: ignore
+        assert display_utils, "PlantDisplayUtils not loaded"
+        image_bytes = await display_utils.render_plant(
+            user_plant.type,
             user_plant.nourishment,
             "clay",
             user_plant.pot_hue,
+            encoding=display_utils.discord_image_encoder.name,
         )
-        image_bytes = utils.PlantDisplayUtils.image_to_bytes(image)
-        image_file = discord.File(image_bytes, filename="plant.png")
+        filename = f"plant.{display_utils.discord_image_encoder.extension}"
+        image_file = discord.File(image_bytes, filename=filename)
 
         # Send them their plant in an embed
         embed = vbu.Embed(
             title=user_plant.name,
             use_random_colour=True,
         )
-        embed.set_image(url="attachment://plant.png")
+        embed.set_image(url=f"attachment://{filename}")
         self.bot.set_footer_from_config(embed)
         await interaction.followup.send(
             embeds=[embed],
@@ -227,21 +231,24 @@ class PlantShowCommands(vbu.Cog[utils.types.Bot]):
         await ctx.interaction.response.defer()
 
         # Get our image
-        images: list[Image.Image] = []
-        for p in user_plants:
-            images.append(utils.PlantDisplayUtils.get_plant_image(
-                p.plant,
-                p.nourishment,
-                "clay",
-                p.pot_hue,
-            ))
-        compiled = utils.PlantDisplayUtils.compile_plant_images(images)
-        image_bytes = utils.PlantDisplayUtils.image_to_bytes(compiled)
-        image_file = discord.File(image_bytes, filename="plants.png")
+        display_utils: Optional[PlantDisplayUtils]
+        display_utils = self.bot.get_cog("PlantDisplayUtils")  # pyright: ignore
+        assert display_utils, "PlantDisplayUtils not loaded"
+        image_bytes = await display_utils.render_garden([
+            {
+                "plant_type": p.type,
+                "plant_nourishment": p.nourishment,
+                "pot_type": "clay",
+                "pot_hue": p.pot_hue,
+            }
+            for p in user_plants
+        ], encoding=display_utils.discord_image_encoder.name)
+        filename = f"plants.{display_utils.discord_image_encoder.extension}"
+        image_file = discord.File(image_bytes, filename=filename)
 
         # Send them their plant in an embed
         embed = vbu.Embed(use_random_colour=True)
-        embed.set_image(url="attachment://plants.png")
+        embed.set_image(url=f"attachment://{filename}")
         self.bot.set_footer_from_config(embed)
         await ctx.interaction.followup.send(
             embeds=[embed],
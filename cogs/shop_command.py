@@ -315,6 +315,7 @@ class ShopCommand(vbu.Cog[utils.types.Bot]):
 
     @vbu.Cog.listener("on_modal_submit")
     @vbu.checks.interaction_filter(start="NAMEPLANT")
+    @utils.unit_of_work
     @vbu.i18n("flower")
     async def shop_plant_modal_name_submit(
             self,
@@ -341,12 +342,13 @@ class ShopCommand(vbu.Cog[utils.types.Bot]):
             )
 
         # Open a database connection to do some checks.
-        async with vbu.Database() as db:
+        async with utils.UnitOfWork.database() as db:
 
             # Make sure they've not hit the global plant limit
             user_plants = await utils.UserPlant.fetch_all_by_user_id(
                 db,
                 interaction.user.id,
+                cached=False,
             )
             if len(user_plants) >= utils.constants.HARD_PLANT_CAP:
                 components = await self.get_shop_components(db, interaction)
@@ -361,6 +363,7 @@ class ShopCommand(vbu.Cog[utils.types.Bot]):
             user_info = await utils.UserInfo.fetch_by_id(
                 db,
                 interaction.user.id,
+                cached=False,
             )
             if len(user_plants) >= user_info.plant_limit:
                 components = await self.get_shop_components(db, interaction)
@@ -407,6 +410,7 @@ class ShopCommand(vbu.Cog[utils.types.Bot]):
 
     @vbu.Cog.listener("on_component_interaction")
     @vbu.checks.interaction_filter(start="GETITEM")
+    @utils.unit_of_work
     @vbu.i18n("flower")
     async def shop_item_get(
             self,
@@ -426,15 +430,43 @@ class ShopCommand(vbu.Cog[utils.types.Bot]):
         else:
             item_object = self.bot.items[item_name]
 
-        # See if the user has enough experience to buy it
-        async with vbu.Database() as db:
-            user_info = await utils.UserInfo.fetch_by_id(
-                db,
-                interaction.user.id,
-            )
+        # Try to take the experience from the user - this only goes through
+        # if they have enough of it
+        async with utils.UnitOfWork.database() as db:
             if item_object.name == "plant_pot":
+                user_info = await utils.UserInfo.fetch_by_id(
+                    db,
+                    interaction.user.id,
+                    cached=False,
+                )
                 item_object.price = self.get_points_for_plant_pot(user_info.plant_limit)
-            if user_info.experience < item_object.price:
+                spent = await utils.UserInfo.spend_experience(
+                    db,
+                    interaction.user.id,
+                    item_object.price,
+                    plant_limit=user_info.plant_limit,
+                )
+            else:
+                async with utils.UserStateCache.transaction(db) as trans:
+                    spent = await utils.UserInfo.spend_experience(
+                        trans,
+                        interaction.user.id,
+                        item_object.price,
+                    )
+
+                    # Add the item to the user via the inventory object
+                    if spent is not None:
+                        user_inventory = await utils.UserInventory.fetch_by_id(
+                            trans,
+                            interaction.user.id,
+                        )
+                        await user_inventory.update(
+                            trans,
+                            **{
+                                item_object.name: 1,
+                            },
+                        )
+            if spent is None:
                 components = await self.get_shop_components(db, interaction)
                 await interaction.response.edit_message(components=components)
                 await interaction.followup.send(
@@ -443,31 +475,6 @@ class ShopCommand(vbu.Cog[utils.types.Bot]):
                 )
                 return
 
-            # They do - start a transaction, reduce the user's experience, and
-            # add the item to the user via the inventory object
-            if item_object.name == "plant_pot":
-                await user_info.update(
-                    db,
-                    experience=user_info.experience - item_object.price,
-                    plant_limit=user_info.plant_limit + 1,
-                )
-            else:
-                async with db.transaction() as trans:
-                    await user_info.update(
-                        trans,
-                        experience=user_info.experience - item_object.price,
-                    )
-                    user_inventory = await utils.UserInventory.fetch_by_id(
-                        trans,
-                        interaction.user.id,
-                    )
-                    await user_inventory.update(
-                        trans,
-                        **{
-                            item_object.name: 1,
-                        },
-                    )
-
             # Get new shop components
             components = await self.get_shop_components(db, interaction)
 
@@ -502,41 +509,34 @@ class ShopCommand(vbu.Cog[utils.types.Bot]):
         Use one of your refresh tokens to give you a new set of shop items.
         """
 
-        # Get the user's inventory
+        # Use one of their refresh tokens and reset their shop, if they have
+        # any tokens to use
         async with vbu.Database() as db:
-            user_inventory = await utils.UserInventory.fetch_by_id(
-                db,
-                ctx.author.id,
-            )
-
-        # See if they have any refresh tokens
-        if user_inventory.get("refresh_token").amount <= 0:
+            async with utils.UserStateCache.transaction(db) as trans:
+                used = await utils.UserInventory.use_item(
+                    trans,
+                    ctx.author.id,
+                    "refresh_token",
+                )
+                if used:
+                    await trans.call(
+                        """
+                        UPDATE
+                            user_available_plants
+                        SET
+                            last_shop_timestamp = '2000-01-01 00:00:00'
+                        WHERE
+                            user_id = $1
+                        """,
+                        ctx.interaction.user.id,
+                    )
+        if not used:
             await ctx.interaction.response.send_message(
                 _("You don't have any refresh tokens!"),
                 ephemeral=True,
             )
             return
 
-        # They do - start a transaction, reduce the user's refresh tokens, and
-        # add the new items to the shop
-        async with vbu.Database() as db:
-            async with db.transaction() as trans:
-                await user_inventory.update(
-                    trans,
-                    refresh_token=-1,
-                )
-                await trans.call(
-                    """
-                    UPDATE
-                        user_available_plants
-                    SET
-                        last_shop_timestamp = '2000-01-01 00:00:00'
-                    WHERE
-                        user_id = $1
-                    """,
-                    ctx.interaction.user.id,
-                )
-
         # Tell them we've done it
         await ctx.interaction.response.send_message(
             _("You have successfully refreshed your shop!"),
@@ -124,30 +124,20 @@ class TradeCommands(vbu.Cog[utils.types.Bot]):
         # Get the user to give it to
         user_id = int(interaction.custom_id.split(" ")[1])
 
-        # Get the user's inventory
+        # Give them the item they selected, if the user still has it
+        item_key = interaction.values[0]
         async with vbu.Database() as db:
-            user_inventory = await utils.UserInventory.fetch_by_id(
+            given = await utils.UserInventory.give_item(
                 db,
                 interaction.user.id,
-            )
-            given_inventory = await utils.UserInventory.fetch_by_id(
-                db,
                 user_id,
+                item_key,
             )
-
-            # Get the item they selected
-            item_key = interaction.values[0]
-            item = user_inventory.get(item_key)
-            if item.amount <= 0:
+            if not given:
                 return await interaction.response.send_message(
                     _("You don't have enough of that item to give."),
                     ephemeral=True,
                 )
-
-            # Give them the item
-            async with db.transaction() as trans:
-                await user_inventory.update(trans, **{item_key: -1})
-                await given_inventory.update(trans, **{item_key: 1})
             await utils.update_achievement_count(
                 db,
                 interaction.user.id,
@@ -158,7 +148,7 @@ class TradeCommands(vbu.Cog[utils.types.Bot]):
         await interaction.response.defer_update()
         message: str = _("You gave {user} 1x {item}!").format(
             user=f"<@{user_id}>",
-            item=item.name,
+            item=item_key,
         )
         try:
             await interaction.channel.send(message)  # pyright: ignore
@@ -1,7 +1,16 @@
-from . import checks, types, autocomplete, constants
+from . import checks, types, autocomplete, constants, colour
+from .cache import *
+from .deadline_scheduler import *
+from .image_encoder import *
 from .image_tools import *
+from .premium_cache import *
+from .vote_cache import *
+from .user_state_cache import *
+from .unit_of_work import *
+from .rate_limiter import *
 from .models import *
 from .display import *
+from .stage_gif_store import *
 from .achievements import *
 
 
@@ -10,11 +19,22 @@ __all__ = (
     'types',
     'autocomplete',
     'constants',
+    'colour',
+    'LRUCache',
+    'DeadlineScheduler',
+    'ImageEncoder',
     'save_transparent_gif',
+    'PremiumCache',
+    'RateLimiter',
+    'VoteCache',
+    'UserStateCache',
+    'UnitOfWork',
+    'unit_of_work',
     'Item',
     'Plant',
     'UserInfo',
     'PlantDisplayUtils',
+    'StageGifStore',
     'Achievement',
     'update_achievement_count',
 )
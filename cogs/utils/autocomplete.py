@@ -1,17 +1,139 @@
-from typing import List
-from difflib import SequenceMatcher
+from __future__ import annotations
+
+import heapq
+from typing import Any, List
 
 import discord
 from discord.ext import vbu
 
+from .cache import LRUCache
 from .models import UserPlant
+from .types import PlantLevelsRow
 
 
 __all__ = (
+    'PlantNameIndex',
     'get_plant_name_autocomplete',
 )
 
 
+MAX_CHOICES = 25
+"""
+The most choices that Discord will show for an autocomplete.
+"""
+
+
+def get_trigrams(text: str) -> frozenset[str]:
+    """
+    Split some (already casefolded) text into the set of three-character
+    chunks that it's made of, padded the same way as Postgres' ``pg_trgm``
+    so that the start of a word counts for more.
+    """
+
+    padded = f"  {text} "
+    return frozenset(
+        padded[i:i + 3]
+        for i in range(len(padded) - 2)
+    )
+
+
+class PlantNameIndex:
+    """
+    The names of one user's plants, prepared so that they can be matched
+    against what the user has typed so far without redoing any work on each
+    keystroke.
+
+    Attributes
+    -----------
+    plants : list[UserPlant]
+        The plants in the index.
+    choices : list[discord.ApplicationCommandOptionChoice]
+        An autocomplete choice for each of the plants.
+    """
+
+    __slots__ = (
+        'plants',
+        'choices',
+        '_folded_names',
+        '_trigrams',
+    )
+
+    def __init__(self, plants: list[UserPlant]):
+        self.plants = plants
+        self.choices = [
+            discord.ApplicationCommandOptionChoice(name=i.name, value=i.name)
+            for i in plants
+        ]
+        self._folded_names = [i.name.casefold() for i in plants]
+        self._trigrams = [get_trigrams(i) for i in self._folded_names]
+
+    def _score(
+            self,
+            index: int,
+            query: str,
+            query_trigrams: frozenset[str]) -> float:
+        name = self._folded_names[index]
+        if name.startswith(query):
+            return 3
+        if query in name:
+            return 2
+        trigrams = self._trigrams[index]
+        return len(trigrams & query_trigrams) / len(trigrams | query_trigrams)
+
+    def search(
+            self,
+            query: str,
+            limit: int = MAX_CHOICES,
+            **filters: Any) -> list[discord.ApplicationCommandOptionChoice]:
+        """
+        Get the choices for the plants that best match a query, best first.
+        Names that start with the query come first, then names that contain
+        it, then the rest by how many trigrams they share with it.
+
+        Parameters
+        -----------
+        query : str
+            What the user has typed so far.
+        limit : int
+            The most choices to return.
+        **filters : Any
+            Attributes that the plants must have to be included, eg
+            ``is_dead=True``.
+        """
+
+        query = query.strip().casefold()
+        query_trigrams = get_trigrams(query)
+        scores: dict[int, float] = {}
+        for index, plant in enumerate(self.plants):
+            if all(getattr(plant, k) == v for k, v in filters.items()):
+                scores[index] = self._score(index, query, query_trigrams)
+        best = heapq.nsmallest(
+            limit,
+            scores,
+            key=lambda i: (-scores[i], self._folded_names[i]),
+        )
+        return [self.choices[i] for i in best]
+
+
+_plant_name_indexes: LRUCache[int, tuple[list[PlantLevelsRow], PlantNameIndex]]
+_plant_name_indexes = LRUCache(10_000)
+
+
+async def get_plant_name_index(user_id: int) -> PlantNameIndex:
+    """
+    Get the plant name index for a user. This is rebuilt only when the
+    user's plants have been fetched again from the database.
+    """
+
+    rows = await UserPlant.fetch_rows_by_user_id(None, user_id)
+    cached = _plant_name_indexes.get(user_id)
+    if cached is not None and cached[0] is rows:
+        return cached[1]
+    index = PlantNameIndex([UserPlant.from_row(i) for i in rows])
+    _plant_name_indexes.set(user_id, (rows, index))
+    return index
+
+
 def get_plant_name_autocomplete(**filters):
     async def plant_name_autocomplete(
             cog: vbu.Cog,
@@ -41,35 +163,9 @@ def get_plant_name_autocomplete(**filters):
                 user_id = int(option.value)  # pyright: ignore
             current_name = options[1].value  # pyright: ignore
 
-        # Get the user's plants
-        async with vbu.Database() as db:
-            user_plants = await UserPlant.fetch_all_by_user_id(db, user_id)
-
-        # Create and sort the options according to how close their spelling is
-        filtered_user_plants = user_plants
-        for k, v in filters.items():
-            filtered_user_plants = [
-                i
-                for i in user_plants
-                if getattr(i, k) == v
-            ]
-        autocomplete_options = [
-            discord.ApplicationCommandOptionChoice(
-                name=i.name,
-                value=i.name,
-            )
-            for i in filtered_user_plants
-        ]
-        autocomplete_options.sort(
-            key=lambda c: (
-                SequenceMatcher(
-                    None,
-                    c.name.casefold(),
-                    (current_name or "").casefold(),
-                ).quick_ratio()
-            ),
-            reverse=True,
-        )
+        # Get the user's plants that match what they've typed so far
+        index = await get_plant_name_index(user_id)
+        autocomplete_options = index.search(current_name or "", **filters)
 
         # Return autocomplete
         await interaction.response.send_autocomplete(autocomplete_options)
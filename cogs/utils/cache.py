@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterator, Optional, TypeVar
+
+
+__all__ = (
+    'LRUCache',
+)
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A least-recently-used cache with a bounded total size. This is safe to
+    use from multiple threads.
+
+    Attributes
+    -----------
+    max_size : Optional[int]
+        The maximum total size of the items in the cache, as measured by
+        ``sizeof``. If ``None``, the cache is unbounded.
+    hits : int
+        The number of lookups that found an item.
+    misses : int
+        The number of lookups that didn't find an item.
+    evictions : int
+        The number of items that have been dropped to make room for others.
+    """
+
+    def __init__(
+            self,
+            max_size: Optional[int] = None,
+            *,
+            sizeof: Optional[Callable[[V], int]] = None):
+        self.max_size = max_size
+        self._sizeof: Callable[[V], int] = sizeof or (lambda _: 1)
+        self._items: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._size: int = 0
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[K]:
+        with self._lock:
+            return iter(list(self._items))
+
+    @property
+    def size(self) -> int:
+        """
+        The total size of all of the items currently in the cache.
+        """
+
+        return self._size
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The proportion of lookups that found an item.
+        """
+
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Get an item from the cache, marking it as recently used.
+
+        Parameters
+        ----------
+        key : K
+            The key of the item to get.
+
+        Returns
+        -------
+        Optional[V]
+            The cached item, or ``None`` if it isn't cached.
+        """
+
+        with self._lock:
+            try:
+                value, _ = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        """
+        Add an item to the cache, evicting the least recently used items if
+        the cache grows past its maximum size. Items larger than the maximum
+        size are not cached.
+
+        Parameters
+        ----------
+        key : K
+            The key of the item.
+        value : V
+            The item to store.
+        """
+
+        size = self._sizeof(value)
+        with self._lock:
+            self._pop(key)
+            if self.max_size is not None and size > self.max_size:
+                return
+            self._items[key] = (value, size)
+            self._size += size
+            self._trim()
+
+    def pop(self, key: K) -> Optional[V]:
+        """
+        Remove an item from the cache.
+
+        Parameters
+        ----------
+        key : K
+            The key of the item to remove.
+
+        Returns
+        -------
+        Optional[V]
+            The removed item, or ``None`` if it wasn't cached.
+        """
+
+        with self._lock:
+            return self._pop(key)
+
+    def _pop(self, key: K) -> Optional[V]:
+        try:
+            value, size = self._items.pop(key)
+        except KeyError:
+            return None
+        self._size -= size
+        return value
+
+    def clear(self) -> None:
+        """
+        Remove all items from the cache.
+        """
+
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def resize(self, max_size: Optional[int]) -> None:
+        """
+        Change the maximum size of the cache, evicting items if necessary.
+
+        Parameters
+        ----------
+        max_size : Optional[int]
+            The new maximum size.
+        """
+
+        with self._lock:
+            self.max_size = max_size
+            self._trim()
+
+    def _trim(self) -> None:
+        """
+        Evict the least recently used items until the cache fits within its
+        maximum size.
+        """
+
+        if self.max_size is None:
+            return
+        while self._size > self.max_size:
+            _, (_, evicted_size) = self._items.popitem(last=False)
+            self._size -= evicted_size
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Get a dictionary of the counters for this cache.
+        """
+
+        return {
+            "items": len(self._items),
+            "size": self._size,
+            "max_size": self.max_size or 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
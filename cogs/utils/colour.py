@@ -0,0 +1,136 @@
+"""
+Array-wide versions of the :mod:`colorsys` RGB/HSV conversions.
+
+These run over whole numpy arrays at once rather than calling back into
+Python for every pixel (as ``np.vectorize(colorsys.rgb_to_hsv)`` does), while
+following the same arithmetic so that the output matches :mod:`colorsys`
+exactly.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+
+__all__ = (
+    'rgb_to_hsv',
+    'hsv_to_rgb',
+)
+
+
+_FloatArray = npt.NDArray[np.float64]
+
+
+def rgb_to_hsv(
+        r: npt.ArrayLike,
+        g: npt.ArrayLike,
+        b: npt.ArrayLike) -> tuple[_FloatArray, _FloatArray, _FloatArray]:
+    """
+    Convert arrays of RGB values into arrays of HSV values.
+
+    Parameters
+    ----------
+    r : npt.ArrayLike
+        The red channel.
+    g : npt.ArrayLike
+        The green channel.
+    b : npt.ArrayLike
+        The blue channel.
+
+    Returns
+    -------
+    tuple[npt.NDArray, npt.NDArray, npt.NDArray]
+        The hue, saturation, and value channels. Hue and saturation are in
+        the range ``[0, 1]``; value is in the same scale as the input.
+    """
+
+    r = np.asarray(r, dtype=np.float64)
+    g = np.asarray(g, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    maxc = np.maximum(np.maximum(r, g), b)
+    minc = np.minimum(np.minimum(r, g), b)
+    rangec = maxc - minc
+    v = maxc
+    grey = rangec == 0
+
+    # Avoid dividing by zero for greys; those pixels are zeroed afterwards
+    safe_maxc = np.where(grey, 1.0, maxc)
+    safe_rangec = np.where(grey, 1.0, rangec)
+    s = np.where(grey, 0.0, rangec / safe_maxc)
+    rc = (maxc - r) / safe_rangec
+    gc = (maxc - g) / safe_rangec
+    bc = (maxc - b) / safe_rangec
+    h = np.select(
+        [r == maxc, g == maxc],
+        [bc - gc, 2.0 + rc - bc],
+        4.0 + gc - rc,
+    )
+    h = np.where(grey, 0.0, (h / 6.0) % 1.0)
+    return h, s, v
+
+
+def hsv_to_rgb(
+        h: npt.ArrayLike,
+        s: npt.ArrayLike,
+        v: npt.ArrayLike) -> tuple[_FloatArray, _FloatArray, _FloatArray]:
+    """
+    Convert arrays of HSV values into arrays of RGB values.
+
+    Any of the parameters can be a scalar - a constant hue (as is used when
+    recolouring a plant pot) means that only one sector of the colour wheel
+    needs to be calculated.
+
+    Parameters
+    ----------
+    h : npt.ArrayLike
+        The hue channel, in the range ``[0, 1]``.
+    s : npt.ArrayLike
+        The saturation channel, in the range ``[0, 1]``.
+    v : npt.ArrayLike
+        The value channel.
+
+    Returns
+    -------
+    tuple[npt.NDArray, npt.NDArray, npt.NDArray]
+        The red, green, and blue channels, in the same scale as ``v``.
+    """
+
+    h = np.asarray(h, dtype=np.float64)
+    s = np.asarray(s, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    h, s, v = np.broadcast_arrays(h, s, v)
+    i = (h * 6.0).astype(np.int64)
+    f = (h * 6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i % 6
+
+    # A single hue means we can just pick the sector without masking
+    if i.size and (i.flat[0] == i).all():
+        r, g, b = (
+            (v, t, p),
+            (q, v, p),
+            (p, v, t),
+            (p, q, v),
+            (t, p, v),
+            (v, p, q),
+        )[int(i.flat[0])]
+    else:
+        sectors = [i == n for n in range(6)]
+        r = np.select(sectors, [v, q, p, p, t, v])
+        g = np.select(sectors, [t, v, v, q, p, p])
+        b = np.select(sectors, [p, p, t, v, v, q])
+
+    # Greys skip the sector maths entirely in colorsys
+    grey = s == 0.0
+    if grey.any():
+        r = np.where(grey, v, r)
+        g = np.where(grey, v, g)
+        b = np.where(grey, v, b)
+    return (
+        np.array(r, dtype=np.float64),
+        np.array(g, dtype=np.float64),
+        np.array(b, dtype=np.float64),
+    )
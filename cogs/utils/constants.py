@@ -11,6 +11,7 @@ __all__ = (
     'WATER_COOLDOWN',
     'NOTIFICATION_TIME',
     'KEYHOLDER_WATER_COOLDOWN',
+    'VOTE_TIMEOUT',
 )
 
 
@@ -45,3 +46,8 @@ KEYHOLDER_WATER_COOLDOWN = timedelta(
     minutes=60,
 )
 """The amount of time a guest has to wait wait before they can water a plant again."""
+
+VOTE_TIMEOUT = timedelta(
+    hours=12,
+)
+"""The amount of time a Top.gg vote lasts before the user can vote again."""
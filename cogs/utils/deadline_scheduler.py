@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+from datetime import datetime as dt, timedelta
+from typing import Generic, Hashable, Iterable, Optional, TypeVar
+
+
+__all__ = (
+    'DeadlineScheduler',
+)
+
+
+K = TypeVar("K", bound=Hashable)
+
+
+class DeadlineScheduler(Generic[K]):
+    """
+    A heap of keys ordered by when they're due. Rescheduling a key doesn't
+    remove its old heap entry - stale entries are skipped when they come up -
+    so scheduling is always ``O(log n)``.
+
+    All of the times are naive UTC datetimes, to match the database.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[dt, K]] = []
+        self._deadlines: dict[K, dt] = {}
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._deadlines
+
+    def schedule(self, key: K, deadline: dt) -> None:
+        """
+        Set when a key is due, replacing any deadline it already had.
+        """
+
+        if self._deadlines.get(key) == deadline:
+            return
+        earliest = self.next_deadline()
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+        if earliest is None or deadline < earliest:
+            self._changed.set()
+
+    def unschedule(self, key: K) -> None:
+        """
+        Remove a key from the schedule, if it's in there.
+        """
+
+        self._deadlines.pop(key, None)
+
+    def replace(self, deadlines: Iterable[tuple[K, dt]]) -> None:
+        """
+        Replace the whole schedule.
+        """
+
+        self._deadlines = dict(deadlines)
+        self._heap = [(o, i) for i, o in self._deadlines.items()]
+        heapq.heapify(self._heap)
+        self._changed.set()
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            deadline, key = self._heap[0]
+            if self._deadlines.get(key) == deadline:
+                return
+            heapq.heappop(self._heap)
+
+    def next_deadline(self) -> Optional[dt]:
+        """
+        Get the time that the next key is due, if there are any scheduled.
+        """
+
+        self._drop_stale()
+        if not self._heap:
+            return None
+        return self._heap[0][0]
+
+    def pop_due(self, now: Optional[dt] = None) -> list[K]:
+        """
+        Remove and return all of the keys that are due.
+        """
+
+        now = now or dt.utcnow()
+        due: list[K] = []
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            due.append(key)
+        return due
+
+    async def wait(self, max_wait: timedelta) -> None:
+        """
+        Wait until the next key is due, or until ``max_wait`` has passed.
+        This wakes up early if something is scheduled ahead of the key that
+        was next.
+        """
+
+        give_up_at = dt.utcnow() + max_wait
+        while True:
+            self._changed.clear()
+            wake_at = min(self.next_deadline() or give_up_at, give_up_at)
+            timeout = (wake_at - dt.utcnow()).total_seconds()
+            if timeout <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import io
+import os
 import random
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, ClassVar, Iterable, Optional
 
 from PIL import Image, ImageOps
 import numpy as np
-import colorsys
 
+from . import colour
+from .cache import LRUCache
+from .image_encoder import ImageEncoder
 from .image_tools import save_transparent_gif
 
 if TYPE_CHECKING:
@@ -24,8 +28,37 @@ class PlantDisplayUtils:
 
     PLANT_SCALE_SIZE = 5
 
-    rgb_to_hsv = np.vectorize(colorsys.rgb_to_hsv)
-    hsv_to_rgb = np.vectorize(colorsys.hsv_to_rgb)
+    rgb_to_hsv = staticmethod(colour.rgb_to_hsv)
+    hsv_to_rgb = staticmethod(colour.hsv_to_rgb)
+
+    # Hue-shifted pot layers, keyed by (pot_type, layer, hue), sized in bytes
+    pot_sprite_cache: ClassVar[LRUCache[tuple[str, str, int], Image.Image]]
+    pot_sprite_cache = LRUCache(
+        max_size=16 * 1024 * 1024,
+        sizeof=lambda i: i.width * i.height * len(i.getbands()),
+    )
+    _pot_layer_sources: ClassVar[dict[tuple[str, str], Image.Image]] = {}
+
+    # Decoded plant stage images, keyed by (plant, folder, level, layer)
+    plant_image_cache: ClassVar[LRUCache[tuple[str, str, int, str], Image.Image]]
+    plant_image_cache = LRUCache(
+        max_size=32 * 1024 * 1024,
+        sizeof=lambda i: i.width * i.height * len(i.getbands()),
+    )
+    _plant_image_index: ClassVar[dict[str, set[str]]] = {}
+
+    # Encoded renders, keyed by a hash of everything that affects the output
+    rendered_plant_cache: ClassVar[LRUCache[str, bytes]] = LRUCache(
+        max_size=64 * 1024 * 1024,
+        sizeof=len,
+    )
+    rendered_plant_directory: ClassVar[Optional[str]] = None
+
+    # Composited plants at native resolution, keyed the same as renders
+    plant_sprite_cache: ClassVar[LRUCache[str, Image.Image]] = LRUCache(
+        max_size=16 * 1024 * 1024,
+        sizeof=lambda i: i.width * i.height * len(i.getbands()),
+    )
 
     @staticmethod
     def sort_plant_rows(rows: list[PlantLevelsRow]) -> list[PlantLevelsRow]:
@@ -59,6 +92,144 @@ class PlantDisplayUtils:
             'RGBA',
         )
 
+    @classmethod
+    def get_pot_layer_source(cls, pot_type: str, layer: str) -> Image.Image:
+        """
+        Get the unshifted image for a layer of a plant pot. The returned image
+        is shared and must not be modified.
+        """
+
+        key = (pot_type, layer)
+        if key not in cls._pot_layer_sources:
+            cls._pot_layer_sources[key] = (
+                Image.open(f"images/pots/{pot_type}/{layer}.png")
+                .convert("RGBA")
+            )
+        return cls._pot_layer_sources[key]
+
+    @classmethod
+    def get_pot_sprite(
+            cls,
+            pot_type: str,
+            layer: str,
+            hue: int) -> Image.Image:
+        """
+        Get a layer of a plant pot shifted to the given hue. The returned
+        image is shared and must not be modified.
+
+        Parameters
+        ----------
+        pot_type : str
+            The type of pot (eg ``"clay"``).
+        layer : str
+            The layer of the pot; one of ``"back"``, ``"soil"``, or
+            ``"front"``.
+        hue : int
+            The hue to shift the layer to.
+        """
+
+        key = (pot_type, layer, hue)
+        sprite = cls.pot_sprite_cache.get(key)
+        if sprite is None:
+            sprite = cls.shift_image_hue(
+                cls.get_pot_layer_source(pot_type, layer),
+                hue,
+            )
+            cls.pot_sprite_cache.set(key, sprite)
+        return sprite
+
+    @classmethod
+    def index_plant_images(cls, plant_name: str) -> None:
+        """
+        Store which image files exist for a given plant, so that we know which
+        stages have overlays or underlays without having to go to disk.
+        """
+
+        files: set[str] = set()
+        for folder in ("alive", "dead"):
+            try:
+                filenames = os.listdir(f"images/plants/{plant_name}/{folder}")
+            except FileNotFoundError:
+                continue
+            files.update(f"{folder}/{i}" for i in filenames)
+        cls._plant_image_index[plant_name] = files
+
+    @classmethod
+    def get_plant_layer(
+            cls,
+            plant_name: str,
+            file_folder: str,
+            plant_level: int,
+            layer: str = "") -> Optional[Image.Image]:
+        """
+        Get a decoded image for a stage of a plant. The returned image is
+        shared and must not be modified.
+
+        Parameters
+        ----------
+        plant_name : str
+            The name of the plant type.
+        file_folder : str
+            Either ``"alive"`` or ``"dead"``.
+        plant_level : int
+            The display level of the plant.
+        layer : str
+            The layer to get; an empty string for the plant itself, or
+            ``"overlay"`` or ``"underlay"``.
+
+        Returns
+        -------
+        Optional[Image.Image]
+            The image for the layer, or ``None`` if the plant has no such
+            overlay or underlay.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the plant has no image for the given stage.
+        """
+
+        if plant_name not in cls._plant_image_index:
+            cls.index_plant_images(plant_name)
+        filename = f"{plant_level}_{layer}.png" if layer else f"{plant_level}.png"
+        plant_files = cls._plant_image_index[plant_name]
+        if layer and f"{file_folder}/{filename}" not in plant_files:
+            return None
+        key = (plant_name, file_folder, plant_level, layer)
+        image = cls.plant_image_cache.get(key)
+        if image is None:
+            image = (
+                Image.open(f"images/plants/{plant_name}/{file_folder}/{filename}")
+                .convert("RGBA")
+            )
+            cls.plant_image_cache.set(key, image)
+        return image
+
+    @classmethod
+    def precompute_pot_sprites(
+            cls,
+            pot_types: Iterable[str],
+            soil_hues: Iterable[int]) -> None:
+        """
+        Fill the pot sprite cache with every pot hue and each of the given
+        soil hues, so that renders never need to shift a pot layer.
+
+        Parameters
+        ----------
+        pot_types : Iterable[str]
+            The pot types to generate sprites for.
+        soil_hues : Iterable[int]
+            The soil hues used by the available plants.
+        """
+
+        soil_hues = set(soil_hues)
+        for pot_type in pot_types:
+            for hue in range(360):
+                cls.get_pot_sprite(pot_type, "back", hue)
+                cls.get_pot_sprite(pot_type, "front", hue)
+            for hue in soil_hues:
+                cls.get_pot_sprite(pot_type, "soil", hue)
+
     @staticmethod
     def crop_image_to_content(image: Image.Image) -> Image.Image:
         """
@@ -83,18 +254,24 @@ class PlantDisplayUtils:
         return Image.fromarray(image_data_new, "RGBA")
 
     @staticmethod
-    def image_to_bytes(image: Image.Image) -> io.BytesIO:
-        image_to_send = io.BytesIO()
-        image.save(image_to_send, "PNG")
-        image_to_send.seek(0)
-        return image_to_send
+    def image_to_bytes(
+            image: Image.Image,
+            encoding: Optional[str] = None) -> io.BytesIO:
+        """
+        Encode an image using the named encoder, defaulting to PNG.
+        """
+
+        return io.BytesIO(ImageEncoder.get(encoding).encode(image))
 
     @staticmethod
     def gif_to_bytes(
             *images: Image.Image,
-            duration: int = 150) -> io.BytesIO:
+            duration: int = 150,
+            scale: int = 1) -> io.BytesIO:
         """
-        Change a list of images into a gif.
+        Change a list of images into a gif. Frames are padded to the same size
+        at their given resolution and then scaled up by ``scale``, so pixel art
+        can be passed in at its native size.
         """
 
         image_to_send = io.BytesIO()
@@ -114,20 +291,19 @@ class PlantDisplayUtils:
                 i,
             )
             new_images.append(base)
-        save_transparent_gif(new_images, duration, image_to_send)
+        save_transparent_gif(new_images, duration, image_to_send, scale=scale)
         image_to_send.seek(0)
         return image_to_send
 
     @classmethod
-    def get_plant_image(
+    def compose_plant_image(
             cls,
-            plant_type: Plant,
+            plant_type: Optional[Plant],
             plant_nourishment: int,
             pot_type: str,
-            pot_hue: int,
-            crop_image: bool = True) -> Image.Image:
+            pot_hue: int) -> Image.Image:
         """
-        Get a BytesIO object containing the binary data of a given plant/pot item.
+        Draw a given plant/pot item at its native resolution.
         """
 
         # See if the plant is dead or not
@@ -149,30 +325,23 @@ class PlantDisplayUtils:
                 plant_type
                 .get_nourishment_display_level(plant_nourishment)
             )
-            plant_image = Image.open(
-                (
-                    f"images/plants/{plant_type.name}/{file_folder}"
-                    f"/{plant_level}.png"
-                )
-            ).convert("RGBA")
-            try:
-                plant_overlay_image = Image.open(
-                    (
-                        f"images/plants/{plant_type.name}/{file_folder}"
-                        f"/{plant_level}_overlay.png"
-                    )
-                ).convert("RGBA")
-            except FileNotFoundError:
-                pass
-            try:
-                plant_underlay_image = Image.open(
-                    (
-                        f"images/plants/{plant_type.name}/{file_folder}"
-                        f"/{plant_level}_underlay.png"
-                    )
-                ).convert("RGBA")
-            except FileNotFoundError:
-                pass
+            plant_image = cls.get_plant_layer(
+                plant_type.name,
+                file_folder,
+                plant_level,
+            )
+            plant_overlay_image = cls.get_plant_layer(
+                plant_type.name,
+                file_folder,
+                plant_level,
+                "overlay",
+            )
+            plant_underlay_image = cls.get_plant_layer(
+                plant_type.name,
+                file_folder,
+                plant_level,
+                "underlay",
+            )
 
         """
         Plants are drawn in the following layer order:
@@ -187,15 +356,11 @@ class PlantDisplayUtils:
         # Start with the underlay image, if it exists
         image = None
         if plant_underlay_image:
-            image = plant_underlay_image
+            image = plant_underlay_image.copy()
 
         # Paste the bot pack that we want onto the image
         offset = (0, 0)  # The offset for the plant pot being pasted into the image
-        pot_back = (
-            Image.open(f"images/pots/{pot_type}/back.png")
-            .convert("RGBA")
-        )
-        pot_back = cls.shift_image_hue(pot_back, pot_hue)
+        pot_back = cls.get_pot_sprite(pot_type, "back", pot_hue)
         if plant_image:
             # Work out the offset for the pot based on the image size
             # This works with or without an underlay
@@ -208,20 +373,12 @@ class PlantDisplayUtils:
             image.paste(pot_back, offset, pot_back)
         else:
             # There was no plant image and there was no underlay
-            image = pot_back
+            # The cached sprite is shared, so we paste onto a copy
+            image = pot_back.copy()
 
         # Paste the soil that we want onto the image
-        pot_soil = (
-            Image.open(f"images/pots/{pot_type}/soil.png")
-            .convert("RGBA")
-        )
-        if plant_type:
-            pot_soil = cls.shift_image_hue(
-                pot_soil,
-                plant_type.soil_hue,
-            )
-        else:
-            pot_soil = cls.shift_image_hue(pot_soil, 0)
+        soil_hue = plant_type.soil_hue if plant_type else 0
+        pot_soil = cls.get_pot_sprite(pot_type, "soil", soil_hue)
         image.paste(pot_soil, offset, pot_soil)
 
         # Paste the plant onto the image
@@ -229,28 +386,198 @@ class PlantDisplayUtils:
             image.paste(plant_image, (0, 0), plant_image)
 
         # Paste the pot foreground onto the image
-        pot_foreground = (
-            Image.open(f"images/pots/{pot_type}/front.png")
-            .convert("RGBA")
-        )
-        pot_foreground = cls.shift_image_hue(pot_foreground, pot_hue)
+        pot_foreground = cls.get_pot_sprite(pot_type, "front", pot_hue)
         image.paste(pot_foreground, offset, pot_foreground)
 
         # And see if we have a pot overlay to paste
         if plant_overlay_image:
             image.paste(plant_overlay_image, (0, 0), plant_overlay_image)
 
-        # Read the bytes
-        image = image.resize(
+        return image
+
+    @classmethod
+    def get_plant_sprite(
+            cls,
+            plant_type: Optional[Plant],
+            plant_nourishment: int,
+            pot_type: str,
+            pot_hue: int) -> Image.Image:
+        """
+        Get a given plant/pot item at its native resolution, cropped to its
+        content. The returned image is shared and must not be modified.
+        """
+
+        key = cls.get_render_key(
+            plant_type,
+            plant_nourishment,
+            pot_type,
+            pot_hue,
+        )
+        sprite = cls.plant_sprite_cache.get(key)
+        if sprite is None:
+            sprite = cls.crop_image_to_content(
+                cls.compose_plant_image(
+                    plant_type,
+                    plant_nourishment,
+                    pot_type,
+                    pot_hue,
+                )
+            )
+            cls.plant_sprite_cache.set(key, sprite)
+        return sprite
+
+    @classmethod
+    def upscale_image(
+            cls,
+            image: Image.Image,
+            scale: Optional[int] = None) -> Image.Image:
+        """
+        Scale up a pixel art image by an integer amount, defaulting to
+        ``PLANT_SCALE_SIZE``.
+        """
+
+        scale = scale or cls.PLANT_SCALE_SIZE
+        return image.resize(
             (
-                image.size[0] * cls.PLANT_SCALE_SIZE,
-                image.size[1] * cls.PLANT_SCALE_SIZE,
+                image.size[0] * scale,
+                image.size[1] * scale,
             ),
             Image.NEAREST,
         )
+
+    @classmethod
+    def get_plant_image(
+            cls,
+            plant_type: Optional[Plant],
+            plant_nourishment: int,
+            pot_type: str,
+            pot_hue: int,
+            crop_image: bool = True,
+            scale: Optional[int] = None) -> Image.Image:
+        """
+        Get an upscaled image of a given plant/pot item. A ``scale`` of ``1``
+        gives the image at its native resolution, for clients that can scale
+        it up themselves.
+        """
+
         if crop_image:
-            return cls.crop_image_to_content(image)
-        return image
+            image = cls.get_plant_sprite(
+                plant_type,
+                plant_nourishment,
+                pot_type,
+                pot_hue,
+            )
+        else:
+            image = cls.compose_plant_image(
+                plant_type,
+                plant_nourishment,
+                pot_type,
+                pot_hue,
+            )
+        if scale == 1:
+            return image
+        return cls.upscale_image(image, scale)
+
+    @classmethod
+    def get_render_key(
+            cls,
+            plant_type: Optional[Plant],
+            plant_nourishment: int,
+            pot_type: str,
+            pot_hue: int,
+            crop_image: bool = True,
+            scale: Optional[int] = None,
+            encoding: Optional[str] = None) -> str:
+        """
+        Get a hash of everything that affects how a plant is rendered. Plants
+        that share a display level share a key.
+        """
+
+        plant_nourishment = int(plant_nourishment)
+        plant_level = 0
+        if plant_nourishment != 0 and plant_type is not None:
+            plant_level = plant_type.get_nourishment_display_level(
+                abs(plant_nourishment),
+            )
+        key = (
+            plant_type.name if plant_type else None,
+            plant_level,
+            plant_nourishment < 0,
+            pot_type,
+            pot_hue,
+            crop_image,
+            scale or cls.PLANT_SCALE_SIZE,
+            ImageEncoder.get(encoding).name,
+        )
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    @classmethod
+    def get_plant_image_bytes(
+            cls,
+            plant_type: Optional[Plant],
+            plant_nourishment: int,
+            pot_type: str,
+            pot_hue: int,
+            crop_image: bool = True,
+            scale: Optional[int] = None,
+            encoding: Optional[str] = None) -> io.BytesIO:
+        """
+        Get the encoded image of a given plant/pot item, using a cached render
+        if one exists.
+        """
+
+        encoder = ImageEncoder.get(encoding)
+        key = cls.get_render_key(
+            plant_type,
+            plant_nourishment,
+            pot_type,
+            pot_hue,
+            crop_image,
+            scale,
+            encoder.name,
+        )
+
+        # See if we have the render in memory
+        data = cls.rendered_plant_cache.get(key)
+        if data is not None:
+            return io.BytesIO(data)
+
+        # See if we have the render on disk
+        filename = None
+        if cls.rendered_plant_directory:
+            filename = os.path.join(
+                cls.rendered_plant_directory,
+                f"{key}.{encoder.extension}",
+            )
+            try:
+                with open(filename, "rb") as a:
+                    data = a.read()
+            except FileNotFoundError:
+                pass
+
+        # Render the plant
+        if data is None:
+            image = cls.get_plant_image(
+                plant_type,
+                plant_nourishment,
+                pot_type,
+                pot_hue,
+                crop_image,
+                scale,
+            )
+            data = encoder.encode(image)
+            if filename:
+                temp_filename = f"{filename}.{os.getpid()}.tmp"
+                try:
+                    with open(temp_filename, "wb") as a:
+                        a.write(data)
+                    os.replace(temp_filename, filename)
+                except OSError:
+                    pass
+
+        # And cache
+        cls.rendered_plant_cache.set(key, data)
+        return io.BytesIO(data)
 
     @classmethod
     def compile_plant_images(
@@ -287,6 +614,65 @@ class PlantDisplayUtils:
         # And Discord it up
         return cls.crop_image_to_content(new_image)
 
+    @classmethod
+    def get_garden_image_bytes(
+            cls,
+            plants: list[tuple[Optional[Plant], int, str, int]],
+            add_flipping: bool = True,
+            encoding: Optional[str] = None) -> io.BytesIO:
+        """
+        Get the encoded image of a set of plants rendered side by side.
+
+        Parameters
+        ----------
+        plants : list[tuple[Optional[Plant], int, str, int]]
+            The plant type, nourishment, pot type, and pot hue of each of the
+            plants to render.
+        add_flipping : bool
+            Whether or not to randomly mirror each plant.
+        encoding : Optional[str]
+            The name of the encoder to save the image with.
+        """
+
+        # Lay the garden out at native resolution and only scale it up once
+        # everything's been pasted
+        sprites = [
+            cls.get_plant_sprite(*plant)
+            for plant in plants
+        ]
+        compiled = cls.compile_plant_images(sprites, add_flipping)
+        return cls.image_to_bytes(cls.upscale_image(compiled), encoding)
+
+    @classmethod
+    def get_stage_gif_bytes(
+            cls,
+            plant_type: Plant,
+            pot_type: str,
+            pot_hue: int,
+            duration: int = 1_000,
+            scale: Optional[int] = None) -> io.BytesIO:
+        """
+        Get a gif cycling through each of the display stages of a plant. The
+        frames are built at native resolution and only scaled up as the gif
+        is encoded.
+        """
+
+        display_levels: list[int] = []  # All display stages
+        added_display_stages: list[int] = []  # All unique display stages
+        for i, o in plant_type.nourishment_display_levels.items():
+            if o not in added_display_stages:
+                display_levels.insert(0, int(i))
+                added_display_stages.append(o)
+        gif_frames: list[Image.Image] = [
+            cls.get_plant_sprite(plant_type, i, pot_type, pot_hue)
+            for i in [0, *display_levels]
+        ]
+        return cls.gif_to_bytes(
+            *gif_frames[::-1],
+            duration=duration,
+            scale=scale or cls.PLANT_SCALE_SIZE,
+        )
+
     @staticmethod
     def get_plant_hang(plant, pot_width):
         return (plant.size[0] - pot_width) // 2
@@ -337,7 +723,7 @@ class PlantDisplayUtils:
             i.size[0] + (spacer_pixels * cls.PLANT_SCALE_SIZE)
             for i in plants
         ])
-        pot_image = Image.open("images/pots/clay/front.png").convert("RGBA")
+        pot_image = cls.get_pot_layer_source("clay", "front")
         pot_width = pot_image.size[0] * cls.PLANT_SCALE_SIZE
 
         # Work out which of our images to flip
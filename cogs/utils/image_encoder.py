@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import io
+import time
+import threading
+from typing import Any, Callable, ClassVar, Optional, TypeVar
+
+import numpy as np
+from PIL import Image
+
+
+__all__ = (
+    'ImageEncoder',
+)
+
+
+T = TypeVar("T")
+
+
+class ImageEncoder:
+    """
+    A file format and the settings used to save images with it. Each encoder
+    keeps count of how many images it's encoded, how large they were, and how
+    long they took, so that different encoders can be compared.
+
+    If images are rendered on a process pool, the counts from each render
+    are carried back to the main process with :meth:`run_counted` and
+    :meth:`add_counts`.
+
+    Attributes
+    -----------
+    name : str
+        The name of the encoder, as used in the config file.
+    format : str
+        The PIL format that images are saved as.
+    indexed : bool
+        Whether images are converted to a palette before they're saved. This
+        is lossless - images with more than 256 colours are saved as they are.
+    save_kwargs : dict[str, Any]
+        Any other arguments that are passed to ``Image.save``.
+    encodes : int
+        The number of images that have been encoded.
+    encoded_bytes : int
+        The total size of the encoded images.
+    encode_time : float
+        The total time (in seconds) spent encoding images.
+    """
+
+    all_encoders: ClassVar[dict[str, ImageEncoder]] = {}
+
+    def __init__(
+            self,
+            name: str,
+            format: str,
+            *,
+            indexed: bool = False,
+            **save_kwargs: Any):
+        self.name = name
+        self.format = format
+        self.indexed = indexed
+        self.save_kwargs = save_kwargs
+        self._lock = threading.Lock()
+        self.encodes: int = 0
+        self.encoded_bytes: int = 0
+        self.encode_time: float = 0.0
+        self.all_encoders[name] = self
+
+    def __repr__(self) -> str:
+        return f"<ImageEncoder name={self.name!r} format={self.format!r}>"
+
+    @classmethod
+    def get(cls, name: Optional[str] = None) -> ImageEncoder:
+        """
+        Get an encoder by its name, defaulting to plain PNG.
+
+        Raises
+        ------
+        KeyError
+            If there's no encoder with the given name.
+        """
+
+        return cls.all_encoders[name or "png"]
+
+    @property
+    def mime_type(self) -> str:
+        return f"image/{self.format.lower()}"
+
+    @property
+    def extension(self) -> str:
+        return self.format.lower()
+
+    @staticmethod
+    def to_indexed(image: Image.Image) -> Optional[tuple[Image.Image, bytes]]:
+        """
+        Losslessly convert an image to a palette. Fully transparent pixels
+        all share one palette entry.
+
+        Returns
+        -------
+        Optional[tuple[Image.Image, bytes]]
+            The paletted image and the alpha value of each palette entry, or
+            ``None`` if the image has too many colours for a palette.
+        """
+
+        image = image.convert("RGBA")
+        colours = image.getcolors(256)
+        if colours is None:
+            return None
+        pixels = np.asarray(image)
+        flat = pixels.reshape(-1).view(np.uint32)
+        flat = np.where(pixels[..., 3].reshape(-1) == 0, 0, flat)
+        palette = np.array([i for _, i in colours], dtype=np.uint8)
+        palette[palette[:, 3] == 0] = 0
+        used = np.unique(palette.view(np.uint32).ravel())
+        indexes = np.searchsorted(used, flat).astype(np.uint8)
+        palette = used.view(np.uint8).reshape(-1, 4)
+        image_p = Image.fromarray(indexes.reshape(pixels.shape[:2]), "P")
+        image_p.putpalette(palette[:, :3].tobytes())
+        return image_p, palette[:, 3].tobytes()
+
+    def encode(self, image: Image.Image) -> bytes:
+        """
+        Save an image with this encoder.
+        """
+
+        start = time.perf_counter()
+        image_to_send = io.BytesIO()
+        save_kwargs = self.save_kwargs
+        if self.indexed:
+            converted = self.to_indexed(image)
+            if converted is not None:
+                image, transparency = converted
+                save_kwargs = {**save_kwargs, "transparency": transparency}
+        image.save(image_to_send, self.format, **save_kwargs)
+        data = image_to_send.getvalue()
+        self.add_counts(1, len(data), time.perf_counter() - start)
+        return data
+
+    def add_counts(
+            self,
+            encodes: int,
+            encoded_bytes: int,
+            encode_time: float) -> None:
+        """
+        Add to the counters for this encoder.
+        """
+
+        with self._lock:
+            self.encodes += encodes
+            self.encoded_bytes += encoded_bytes
+            self.encode_time += encode_time
+
+    @classmethod
+    def run_counted(
+            cls,
+            func: Callable[..., T],
+            *args: Any) -> tuple[T, dict[str, tuple[int, int, float]]]:
+        """
+        Call a function, returning its result along with what each encoder
+        counted while it ran, by name. This is used to send the counts from
+        a render process back to the main process, so it assumes that
+        nothing else in the process is encoding at the same time.
+        """
+
+        before = {
+            name: (i.encodes, i.encoded_bytes, i.encode_time)
+            for name, i in cls.all_encoders.items()
+        }
+        result = func(*args)
+        counts = {}
+        for name, encoder in cls.all_encoders.items():
+            encodes, encoded_bytes, encode_time = before[name]
+            if encoder.encodes != encodes:
+                counts[name] = (
+                    encoder.encodes - encodes,
+                    encoder.encoded_bytes - encoded_bytes,
+                    encoder.encode_time - encode_time,
+                )
+        return result, counts
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Get a dictionary of the counters for this encoder.
+        """
+
+        return {
+            "encodes": self.encodes,
+            "encoded_bytes": self.encoded_bytes,
+            "encode_time": self.encode_time,
+            "average_size": self.encoded_bytes / (self.encodes or 1),
+            "average_time": self.encode_time / (self.encodes or 1),
+        }
+
+    @classmethod
+    def all_stats(cls) -> dict[str, dict[str, int | float]]:
+        """
+        Get the counters for every encoder, keyed by name.
+        """
+
+        return {
+            name: encoder.stats()
+            for name, encoder in cls.all_encoders.items()
+        }
+
+
+# PIL's defaults, which is what we've always sent
+ImageEncoder("png", "PNG")
+
+# Bigger files, but about twice as quick to make
+ImageEncoder("png-fast", "PNG", compress_level=1)
+
+# Plant sprites only have a handful of colours, so a palette roughly halves
+# the size of the file
+ImageEncoder("png-indexed", "PNG", indexed=True)
+
+# The smallest output, for browsers
+ImageEncoder("webp", "WEBP", lossless=True)
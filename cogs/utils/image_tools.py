@@ -10,14 +10,15 @@
 # (among other issues) when the GIF is saved using PIL.Image.save().
 # This code works around the issue and allows us to properly generate
 # transparent GIFs.
+#
+# The converter has since been rewritten to work on numpy arrays rather than
+# Python sets and loops.
 from __future__ import annotations
 
 from typing import Tuple, List, Union
-from collections import defaultdict
-from random import randrange
-from itertools import chain
 
-from PIL.Image import Image
+import numpy as np
+from PIL.Image import Image, NEAREST
 
 
 __all__ = (
@@ -27,79 +28,82 @@ __all__ = (
 
 class TransparentAnimatedGifConverter:
 
-    _PALETTE_SLOTSET = set(range(256))
-
     def __init__(self, img_rgba: Image, alpha_threshold: int = 0):
         self._img_rgba = img_rgba
         self._alpha_threshold = alpha_threshold
 
     def _process_pixels(self):
         """
-        Set the transparent pixels to the color 0.
+        Work out which of the pixels are transparent.
         """
 
-        self._transparent_pixels = set(
-            idx for idx, alpha in enumerate(
-                self._img_rgba.getchannel(channel='A').getdata())
-            if alpha <= self._alpha_threshold)
+        alpha = np.asarray(self._img_rgba.getchannel(channel='A')).ravel()
+        self._transparent_mask = alpha <= self._alpha_threshold
 
     def _set_parsed_palette(self):
         """
-        Parse the RGB palette color `tuple`s from the palette.
+        Parse the palette into a ``(256, 3)`` array, and work out which of its
+        indexes are used by the visible pixels.
         """
 
-        palette = self._img_p.getpalette()
-        assert palette is not None
-        self._img_p_used_palette_idxs = set(
-            idx for pal_idx, idx in enumerate(self._img_p_data)
-            if pal_idx not in self._transparent_pixels)
-        self._img_p_parsedpalette = dict(
-            (idx, tuple(palette[idx * 3:idx * 3 + 3]))
-            for idx in self._img_p_used_palette_idxs)
+        palette = self._img_p.getpalette() or []
+        parsed = np.zeros(256 * 3, dtype=np.int16)
+        parsed[:len(palette)] = palette[:256 * 3]
+        self._img_p_parsedpalette = parsed.reshape(256, 3)
+        self._img_p_used_palette_idxs = np.bincount(
+            self._img_p_data[~self._transparent_mask],
+            minlength=256,
+        ).astype(bool)
 
-    def _get_similar_color_idx(self):
+    def _get_similar_color_idx(self) -> int:
         """
         Return a palette index with the closest similar color.
         """
 
-        old_color = self._img_p_parsedpalette[0]
-        dict_distance = defaultdict(list)
-        for idx in range(1, 256):
-            color_item = self._img_p_parsedpalette[idx]
-            if color_item == old_color:
-                return idx
-            distance = sum((
-                abs(old_color[0] - color_item[0]),  # Red
-                abs(old_color[1] - color_item[1]),  # Green
-                abs(old_color[2] - color_item[2])))  # Blue
-            dict_distance[distance].append(idx)
-        return dict_distance[sorted(dict_distance)[0]][0]
+        distances = np.abs(
+            self._img_p_parsedpalette[1:]
+            - self._img_p_parsedpalette[0]
+        ).sum(axis=1)
+        return int(distances.argmin()) + 1
 
     def _remap_palette_idx_zero(self):
         """
         Since the first color is used in the palette, remap it.
         """
 
-        free_slots = self._PALETTE_SLOTSET - self._img_p_used_palette_idxs
-        new_idx = free_slots.pop() if free_slots else \
-            self._get_similar_color_idx()
-        self._img_p_used_palette_idxs.add(new_idx)
-        self._palette_replaces['idx_from'].append(0)
-        self._palette_replaces['idx_to'].append(new_idx)
+        free_slots = np.flatnonzero(~self._img_p_used_palette_idxs)
+        new_idx = (
+            int(free_slots[0])
+            if free_slots.size
+            else self._get_similar_color_idx()
+        )
+        self._img_p_used_palette_idxs[new_idx] = True
+        self._palette_lut[0] = new_idx
         self._img_p_parsedpalette[new_idx] = self._img_p_parsedpalette[0]
-        del(self._img_p_parsedpalette[0])
 
-    def _get_unused_color(self) -> tuple:
+    def _get_unused_colors(self, count: int) -> np.ndarray:
         """
-        Return a color for the palette that does not collide with any other
-        already in the palette.
+        Return colors for the palette that do not collide with any other
+        already in use.
         """
 
-        used_colors = set(self._img_p_parsedpalette.values())
-        while True:
-            new_color = (randrange(256), randrange(256), randrange(256))
-            if new_color not in used_colors:
-                return new_color
+        used_colors = self._img_p_parsedpalette[self._img_p_used_palette_idxs]
+        used_codes = (
+            (used_colors[:, 0].astype(np.int32) << 16)
+            | (used_colors[:, 1].astype(np.int32) << 8)
+            | used_colors[:, 2].astype(np.int32)
+        )
+
+        # There are at most 256 used colors, so some of the first 256 + count
+        # codes must be free
+        codes = np.setdiff1d(
+            np.arange(256 + count, dtype=np.int32),
+            used_codes,
+        )[:count]
+        return np.stack(
+            ((codes >> 16) & 0xFF, (codes >> 8) & 0xFF, codes & 0xFF),
+            axis=1,
+        )
 
     def _process_palette(self):
         """
@@ -108,33 +112,33 @@ class TransparentAnimatedGifConverter:
         """
 
         self._set_parsed_palette()
-        if 0 in self._img_p_used_palette_idxs:
+        if self._img_p_used_palette_idxs[0]:
             self._remap_palette_idx_zero()
-        self._img_p_parsedpalette[0] = self._get_unused_color()
 
     def _adjust_pixels(self):
         """
         Convert the pixels into their new values.
         """
 
-        if self._palette_replaces['idx_from']:
-            trans_table = bytearray.maketrans(
-                bytes(self._palette_replaces['idx_from']),
-                bytes(self._palette_replaces['idx_to']))
-            self._img_p_data = self._img_p_data.translate(trans_table)
-        for idx_pixel in self._transparent_pixels:
-            self._img_p_data[idx_pixel] = 0
-        self._img_p.frombytes(data=bytes(self._img_p_data))
+        self._img_p_data = self._palette_lut[self._img_p_data]
+        self._img_p_data[self._transparent_mask] = 0
+        self._img_p.frombytes(data=self._img_p_data.tobytes())
 
     def _adjust_palette(self):
         """
-        Modify the palette in the new `Image`.
+        Modify the palette in the new `Image`. The transparent color and the
+        color used to fill unused slots are both distinct from any visible
+        color.
         """
 
-        unused_color = self._get_unused_color()
-        final_palette = chain.from_iterable(
-            self._img_p_parsedpalette.get(x, unused_color) for x in range(256))
-        self._img_p.putpalette(data=final_palette)
+        transparent_color, unused_color = self._get_unused_colors(2)
+        final_palette = np.where(
+            self._img_p_used_palette_idxs[:, None],
+            self._img_p_parsedpalette,
+            unused_color,
+        )
+        final_palette[0] = transparent_color
+        self._img_p.putpalette(data=final_palette.astype(np.uint8).tobytes())
 
     def process(self) -> Image:
         """
@@ -142,8 +146,11 @@ class TransparentAnimatedGifConverter:
         """
 
         self._img_p = self._img_rgba.convert(mode='P')
-        self._img_p_data = bytearray(self._img_p.tobytes())
-        self._palette_replaces = dict(idx_from=list(), idx_to=list())
+        self._img_p_data = np.frombuffer(
+            self._img_p.tobytes(),
+            dtype=np.uint8,
+        )
+        self._palette_lut = np.arange(256, dtype=np.uint8)
         self._process_pixels()
         self._process_palette()
         self._adjust_pixels()
@@ -155,7 +162,8 @@ class TransparentAnimatedGifConverter:
 
 def _create_animated_gif(
         images: List[Image],
-        durations: Union[int, List[int]]) -> Tuple[Image, dict]:
+        durations: Union[int, List[int]],
+        scale: int = 1) -> Tuple[Image, dict]:
     """
     If the image is a GIF, create an its thumbnail here.
     """
@@ -164,12 +172,19 @@ def _create_animated_gif(
     new_images: List[Image] = []
 
     for frame in images:
-        thumbnail = frame.copy()  # type: Image
-        thumbnail_rgba = thumbnail.convert(mode='RGBA')
-        thumbnail_rgba.thumbnail(size=frame.size, reducing_gap=3.0)
-        converter = TransparentAnimatedGifConverter(img_rgba=thumbnail_rgba)
-        thumbnail_p = converter.process()  # type: Image
-        new_images.append(thumbnail_p)
+        frame_rgba = frame.convert(mode='RGBA')
+        converter = TransparentAnimatedGifConverter(img_rgba=frame_rgba)
+        frame_p = converter.process()  # type: Image
+        if scale != 1:
+            # Scaling the paletted frame keeps the palette and transparency
+            # index, so the conversion above only runs on native pixels
+            scaled_p = frame_p.resize(
+                (frame_p.size[0] * scale, frame_p.size[1] * scale),
+                NEAREST,
+            )
+            scaled_p.info.update(frame_p.info)
+            frame_p = scaled_p
+        new_images.append(frame_p)
 
     output_image = new_images[0]
     save_kwargs.update(
@@ -187,7 +202,8 @@ def _create_animated_gif(
 def save_transparent_gif(
         images: List[Image],
         durations: Union[int, List[int]],
-        save_file):
+        save_file,
+        scale: int = 1):
     """
     Creates a transparent GIF, adjusting to avoid transparency issues that are
     present in the PIL library.
@@ -206,7 +222,10 @@ def save_transparent_gif(
         A filename (string), pathlib.Path object or file object
         (this parameter corresponds and is passed to the
         PIL.Image.save() method).
+    scale : int
+        An integer amount to scale each frame up by (using nearest neighbour
+        resampling) after it's been converted.
     """
 
-    root_frame, save_args = _create_animated_gif(images, durations)
+    root_frame, save_args = _create_animated_gif(images, durations, scale)
     root_frame.save(save_file, **save_args)
@@ -1,17 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime as dt
-from typing import Optional, Literal
+from typing import ClassVar, Optional, Literal
 from typing_extensions import Self
-import aiohttp
 
 from discord.ext import vbu
 
+from ..constants import VOTE_TIMEOUT
+from ..premium_cache import PremiumCache
 from ..types import UserSettingsRow
+from ..user_state_cache import UserStateCache
 
 
 class UserInfo:
 
+    premium_cache: ClassVar[PremiumCache] = PremiumCache(
+        "https://voxelfox.co.uk/api/portal/check",
+        "818013fb-c079-400b-b116-42ee0ab0ab99",
+    )
+    cache: ClassVar[UserStateCache[Optional[UserSettingsRow]]] = UserStateCache()
+
     __slots__ = (
         'user_id',
         'plant_limit',
@@ -20,6 +29,7 @@ class UserInfo:
         'last_plant_shop_time',
         '_plant_pot_hue',
         'has_premium',
+        'last_vote_time',
     )
 
     def __init__(
@@ -29,7 +39,8 @@ class UserInfo:
             pot_type: Literal["clay"] = "clay",
             user_experience: int = 0,
             last_plant_shop_time: Optional[dt] = None,
-            plant_pot_hue: Optional[int] = None):
+            plant_pot_hue: Optional[int] = None,
+            last_vote_time: Optional[dt] = None):
         self.user_id = user_id
         self.plant_limit = plant_limit
         self.pot_type = pot_type
@@ -37,6 +48,7 @@ class UserInfo:
         self.last_plant_shop_time = last_plant_shop_time or dt(2000, 1, 1)
         self._plant_pot_hue = plant_pot_hue
         self.has_premium = False
+        self.last_vote_time = last_vote_time
 
     @classmethod
     def from_row(cls, row: UserSettingsRow):
@@ -47,6 +59,7 @@ class UserInfo:
             user_experience=row.get("user_experience", 0),
             last_plant_shop_time=row.get("last_plant_shop_time", None),
             plant_pot_hue=row.get("plant_pot_hue", None),
+            last_vote_time=row.get("last_vote_time", None),
         )
 
     @property
@@ -59,51 +72,119 @@ class UserInfo:
     def plant_pot_hue(self, value: int) -> None:
         self._plant_pot_hue = value
 
+    @property
+    def has_voted(self) -> bool:
+        """
+        Whether or not a Top.gg vote for this user has been received by
+        webhook within the last vote window.
+        """
+
+        if self.last_vote_time is None:
+            return False
+        return self.last_vote_time + VOTE_TIMEOUT > dt.utcnow()
+
     @classmethod
     async def fetch_by_id(
             cls,
             db: vbu.Database | vbu.DatabaseTransaction,
-            user_id: int) -> Self:
+            user_id: int,
+            *,
+            cached: bool = True) -> Self:
+        """
+        Fetch a user info object by user ID. Outside of transactions, this
+        reads through :attr:`cache` unless ``cached=False`` is given, as it
+        should be for anything that's going to be written back.
+        """
+
+        async def fetch() -> Optional[UserSettingsRow]:
+            record = await db.call(
+                """
+                SELECT
+                    *
+                FROM
+                    user_settings
+                WHERE
+                    user_id = $1
+                """,
+                user_id,
+                type=UserSettingsRow,
+            )
+            return record[0] if record else None
+
+        if not cached or isinstance(db, vbu.DatabaseTransaction):
+            row = await fetch()
+        else:
+            row = await cls.cache.get(user_id, fetch)
+        if row is None:
+            return cls.from_row(dict(user_id=user_id))  # pyright: ignore
+        v = cls.from_row(row)
+        v.has_premium = await cls.check_premium(v.user_id)
+        return v
+
+    @classmethod
+    async def fetch_many(
+            cls,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            user_ids: list[int],
+            *,
+            check_premium: bool = False) -> dict[int, Self]:
         """
-        Fetch a user info object by user ID.
+        Fetch the user info objects for a lot of users at once. This always
+        goes to the database, so that batch jobs don't push everyone else
+        out of the cache.
+
+        Parameters
+        -----------
+        db : vbu.Database | vbu.DatabaseTransaction
+            The database connection to use.
+        user_ids : list[int]
+            The IDs of the users to fetch.
+        check_premium : bool
+            Whether or not to look up if each of the users has premium. If
+            not, ``has_premium`` is left as ``False``.
+
+        Returns
+        -------
+        dict[int, Self]
+            Each of the given user IDs, and their user info.
         """
 
-        record = await db.call(
+        rows = await db.call(
             """
             SELECT
                 *
             FROM
                 user_settings
             WHERE
-                user_id = $1
+                user_id = ANY($1::BIGINT[])
             """,
-            user_id,
+            user_ids,
             type=UserSettingsRow,
         )
-        if not record:
-            return cls.from_row(dict(user_id=user_id))  # pyright: ignore
-        v = cls.from_row(record[0])
-        v.has_premium = await cls.check_premium(v.user_id)
-        return v
+        users = {
+            row["user_id"]: cls.from_row(row)
+            for row in rows
+        }
+        for user_id in user_ids:
+            if user_id not in users:
+                users[user_id] = cls.from_row(dict(user_id=user_id))  # pyright: ignore
+        if check_premium:
+            has_premium = await asyncio.gather(*(
+                cls.check_premium(i)
+                for i in users
+            ))
+            for user, premium in zip(users.values(), has_premium):
+                user.has_premium = premium
+        return users
 
-    @staticmethod
-    async def check_premium(user_id: int) -> bool:
+    @classmethod
+    async def check_premium(cls, user_id: int) -> bool:
         """
-        Check if a given user ID has a Flower Premium subscription.
+        Check if a given user ID has a Flower Premium subscription. Results
+        are cached - see :attr:`premium_cache`.
         """
 
-        url = "https://voxelfox.co.uk/api/portal/check"
-        params = {
-            "discord_user_id": user_id,
-            "product_id": "818013fb-c079-400b-b116-42ee0ab0ab99",
-        }
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as site:
-                    data = await site.json()
-            return data["result"]
-        except Exception:
-            return False
+        return await cls.premium_cache.check(user_id)
 
     async def update(
             self,
@@ -153,3 +234,107 @@ class UserInfo:
             self.last_plant_shop_time,
             self.plant_pot_hue,
         )
+        self.cache.invalidate(self.user_id)
+
+    @classmethod
+    async def add_experience(
+            cls,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            user_id: int,
+            amount: int) -> int:
+        """
+        Add experience to a user. This is done as an increment in the
+        database, so concurrent changes to the same user don't overwrite
+        each other.
+
+        Returns
+        -------
+        int
+            The user's new amount of experience.
+        """
+
+        rows = await db.call(
+            """
+            INSERT INTO
+                user_settings
+                (
+                    user_id,
+                    user_experience
+                )
+            VALUES
+                (
+                    $1,
+                    $2
+                )
+            ON CONFLICT
+                (user_id)
+            DO UPDATE
+            SET
+                user_experience = (
+                    COALESCE(user_settings.user_experience, 0)
+                    + excluded.user_experience
+                )
+            RETURNING
+                user_experience
+            """,
+            user_id,
+            amount,
+        )
+        cls.cache.invalidate(user_id)
+        return rows[0]["user_experience"]
+
+    @classmethod
+    async def spend_experience(
+            cls,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            user_id: int,
+            amount: int,
+            *,
+            plant_limit: Optional[int] = None) -> Optional[int]:
+        """
+        Take experience from a user, but only if they have enough of it.
+
+        Parameters
+        -----------
+        db : vbu.Database | vbu.DatabaseTransaction
+            The database connection to use.
+        user_id : int
+            The ID of the user who's spending the experience.
+        amount : int
+            The amount of experience to spend.
+        plant_limit : Optional[int]
+            If given, the user's plant limit is increased by one as part of
+            the same purchase, as long as it's still this value.
+
+        Returns
+        -------
+        Optional[int]
+            The user's new amount of experience, or ``None`` if nothing was
+            spent.
+        """
+
+        rows = await db.call(
+            """
+            UPDATE
+                user_settings
+            SET
+                user_experience = COALESCE(user_experience, 0) - $2,
+                plant_limit = plant_limit + $3
+            WHERE
+                user_id = $1
+            AND
+                COALESCE(user_experience, 0) >= $2
+            AND
+                ($4::INTEGER IS NULL OR plant_limit = $4)
+            RETURNING
+                user_experience
+            """,
+            user_id,
+            amount,
+            0 if plant_limit is None else 1,
+            plant_limit,
+        )
+        if not rows:
+            return None
+        cls.cache.invalidate(user_id)
+        return rows[0]["user_experience"]
@@ -15,11 +15,25 @@ __all__ = (
 
 
 class UserInventoryItem:
+    """
+    An item in a user's inventory.
+
+    Attributes
+    -----------
+    user_id : int
+        The ID of the user who owns the item.
+    name : str
+        The name of the item.
+    change : int
+        How much the amount of this item has changed since it was last
+        saved to the database.
+    """
 
     __slots__ = (
         'user_id',
         'name',
         '_amount',
+        'change',
     )
 
     def __init__(
@@ -30,6 +44,7 @@ class UserInventoryItem:
         self.user_id = user_id
         self.name = name
         self._amount = amount
+        self.change = 0
 
     @property
     def amount(self) -> int:
@@ -57,6 +72,10 @@ class UserInventory:
         The ID of the associated user.
     items : dict[str, UserInventoryItem]
         A dictionary of the items in the user's inventory.
+
+    Item names are always written to the database in lowercase, and are
+    looked up by exact name. Amounts that are stored as negative are shown
+    as (and added to as if they were) zero.
     """
 
     user_id: int
@@ -77,8 +96,9 @@ class UserInventory:
             The item in the user's inventory.
         """
 
+        item_name = item_name.lower()
         return self.items.get(
-            item_name.lower(),
+            item_name,
             UserInventoryItem(
                 self.user_id,
                 item_name,
@@ -119,6 +139,45 @@ class UserInventory:
             }
         )
 
+    @classmethod
+    async def fetch_many(
+            cls,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            user_ids: list[int]) -> dict[int, Self]:
+        """
+        Fetch the inventories for a lot of users at once.
+
+        Returns
+        -------
+        dict[int, Self]
+            Each of the given user IDs, and their inventory.
+        """
+
+        inventory_rows = await db.call(
+            """
+            SELECT
+                user_id, item_name, amount
+            FROM
+                user_inventory
+            WHERE
+                user_id = ANY($1::BIGINT[])
+            """,
+            user_ids,
+            type=UserInventoryRow,
+        )
+        inventories = {
+            i: cls(user_id=i)
+            for i in user_ids
+        }
+        for row in inventory_rows:
+            item = UserInventoryItem(
+                user_id=row['user_id'],
+                name=row['item_name'],
+                amount=row['amount'],
+            )
+            inventories[item.user_id].items[item.name.lower()] = item
+        return inventories
+
     async def update(
             self,
             db: vbu.Database | vbu.DatabaseTransaction,
@@ -132,23 +191,34 @@ class UserInventory:
         for item_name, amount in kwargs.items():
             item = self.get(item_name)
             item.amount += amount
-            self.items[item_name] = item
-        if isinstance(db, vbu.DatabaseTransaction):
-            await self._save(db)
-        else:
-            await self.save(db)
+            item.change += amount
+            self.items[item.name] = item
+        await self.save(db)
 
-    async def save(self, db: vbu.Database) -> None:
-        """
-        Save the user inventory object to the database.
+    async def save(self, db: vbu.Database | vbu.DatabaseTransaction) -> None:
         """
+        Save any changes to the user inventory object to the database. Only
+        items that have changed are saved, and they're saved as increments,
+        so changes made elsewhere in the meantime aren't overwritten.
 
-        async with db.transaction(commit_on_exit=False) as transaction:
-            await self._save(transaction)
-            await transaction.commit()
+        Raises
+        ------
+        ValueError
+            If any of the items have been taken away - use :meth:`use_item`
+            or :meth:`give_item` for that, since they check that the user
+            has enough of the item first.
+        """
 
-    async def _save(self, db: vbu.Database | vbu.DatabaseTransaction) -> None:
-        await db.execute_many(
+        changed = [
+            item
+            for item in self.items.values()
+            if item.change
+        ]
+        if not changed:
+            return
+        if any(item.change < 0 for item in changed):
+            raise ValueError("Items can only be taken with use_item or give_item")
+        await db.call(
             """
             INSERT INTO
                 user_inventory
@@ -157,20 +227,123 @@ class UserInventory:
                     item_name,
                     amount
                 )
-            VALUES
+            SELECT
+                $1,
+                item_name,
+                amount
+            FROM
+                UNNEST($2::TEXT[], $3::SMALLINT[])
+                    AS changed (item_name, amount)
+            ON CONFLICT
+                (user_id, item_name)
+            DO UPDATE
+            SET
+                amount = GREATEST(user_inventory.amount, 0) + excluded.amount
+            """,
+            self.user_id,
+            [item.name.lower() for item in changed],
+            [item.change for item in changed],
+        )
+        for item in changed:
+            item.change = 0
+
+    @classmethod
+    async def use_item(
+            cls,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            user_id: int,
+            item_name: str,
+            amount: int = 1) -> bool:
+        """
+        Take items out of a user's inventory so that they can be used. This
+        only goes through if the user has enough of the item, so it can't be
+        used twice at once.
+
+        Returns
+        -------
+        bool
+            Whether or not the items were taken.
+        """
+
+        rows = await db.call(
+            """
+            UPDATE
+                user_inventory
+            SET
+                amount = amount - $3
+            WHERE
+                user_id = $1
+            AND
+                item_name = $2
+            AND
+                amount >= $3
+            RETURNING
+                amount
+            """,
+            user_id,
+            item_name.lower(),
+            amount,
+        )
+        return bool(rows)
+
+    @classmethod
+    async def give_item(
+            cls,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            giver_id: int,
+            receiver_id: int,
+            item_name: str,
+            amount: int = 1) -> bool:
+        """
+        Move items from one user's inventory to another's. This only goes
+        through if the giver has enough of the item.
+
+        Returns
+        -------
+        bool
+            Whether or not the items were given.
+        """
+
+        rows = await db.call(
+            """
+            WITH taken_items AS (
+                UPDATE
+                    user_inventory
+                SET
+                    amount = amount - $4
+                WHERE
+                    user_id = $1
+                AND
+                    item_name = $3
+                AND
+                    amount >= $4
+                RETURNING
+                    item_name
+            )
+            INSERT INTO
+                user_inventory
                 (
-                    $1,
-                    $2,
-                    $3
+                    user_id,
+                    item_name,
+                    amount
                 )
+            SELECT
+                $2,
+                item_name,
+                $4
+            FROM
+                taken_items
             ON CONFLICT
                 (user_id, item_name)
             DO UPDATE
             SET
-                amount = excluded.amount
+                amount = GREATEST(user_inventory.amount, 0) + excluded.amount
+            RETURNING
+                amount
             """,
-            *[
-                (self.user_id, item.name, item.amount)
-                for item in self.items.values()
-            ]
+            giver_id,
+            receiver_id,
+            item_name.lower(),
+            amount,
         )
+        return bool(rows)
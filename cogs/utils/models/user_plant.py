@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime as dt
-from typing import Optional
+from datetime import datetime as dt, timedelta
+from typing import Any, Callable, ClassVar, Optional
 from typing_extensions import Self
 
 from discord.ext import vbu
@@ -10,6 +10,8 @@ from discord.ext import vbu
 from .plant import Plant
 from ..types import PlantLevelsRow
 from ..constants import WATER_COOLDOWN
+from ..unit_of_work import UnitOfWork
+from ..user_state_cache import UserStateCache
 
 
 __all__ = (
@@ -20,10 +22,41 @@ __all__ = (
 class UserPlant:
     """
     A representation of a user's plant from the database.
+
+    Attributes
+    -----------
+    listeners : ClassVar[list[Callable[[UserPlant, bool], None]]]
+        Functions that are called with a plant (and whether or not it was
+        deleted) whenever it's saved to or deleted from the database, for
+        anything that keeps plant state in memory.
+    cache : ClassVar[UserStateCache[list[PlantLevelsRow]]]
+        The rows for each user's plants, as read through by the fetch
+        methods. This is skipped inside of transactions and when reading
+        with ``cached=False``, so that anything that's about to be written
+        is based on the database.
     """
 
+    listeners: ClassVar[list[Callable[[UserPlant, bool], None]]] = []
+    cache: ClassVar[UserStateCache[list[PlantLevelsRow]]] = UserStateCache()
+
+    # The database column for each of the attributes that can be updated
+    COLUMNS: ClassVar[dict[str, str]] = {
+        'user_id': 'user_id',
+        'name': 'plant_name',
+        'type': 'plant_type',
+        'variant': 'plant_variant',
+        'nourishment': 'plant_nourishment',
+        'last_water_time': 'last_water_time',
+        'original_owner_id': 'original_owner_id',
+        'pot_hue': 'plant_pot_hue',
+        'adoption_time': 'plant_adoption_time',
+        'notification_sent': 'notification_sent',
+        'immortal': 'immortal',
+    }
+
     __slots__ = (
         '_id',
+        '_saved',
         'user_id',
         'name',
         'type',
@@ -64,6 +97,41 @@ class UserPlant:
         self.notification_sent: bool = notification_sent
         self.immortal: bool = immortal
 
+        # A plant that was made without an ID hasn't been saved yet
+        self._saved: Optional[dict[str, Any]] = None
+        if id is not None:
+            self._mark_saved()
+
+    @classmethod
+    def from_row(cls, row: PlantLevelsRow) -> Self:
+        """
+        Make a plant from a database row. This sets the attributes straight
+        from the row rather than going through keyword arguments, since it's
+        used when loading plants in bulk.
+        """
+
+        v = cls.__new__(cls)
+        v._id = row["id"]
+        v.user_id = row["user_id"]
+        v.name = row["plant_name"]
+        v.type = row["plant_type"]
+        v.variant = row["plant_variant"]
+        v.nourishment = row["plant_nourishment"]
+        v.last_water_time = row["last_water_time"]
+        v.original_owner_id = row["original_owner_id"]
+        v.pot_hue = row["plant_pot_hue"]
+        v.adoption_time = row["plant_adoption_time"]
+        v.notification_sent = row["notification_sent"]
+        v.immortal = row["immortal"]
+        v._mark_saved()
+        return v
+
+    def _mark_saved(self) -> None:
+        self._saved = {
+            i: getattr(self, i)
+            for i in self.COLUMNS
+        }
+
     @property
     def id(self) -> str:
         if self._id is None:
@@ -99,17 +167,35 @@ class UserPlant:
         return Plant.all_plants[self.type]
 
     @classmethod
-    async def fetch_by_name(
+    async def fetch_rows_by_user_id(
             cls,
-            db: vbu.Database,
+            db: vbu.Database | vbu.DatabaseTransaction | None,
             user_id: int,
-            plant_name: str) -> Optional[Self]:
+            *,
+            cached: bool = True) -> list[PlantLevelsRow]:
         """
-        Get a user's plant from the database.
+        Get the rows for all of a user's plants, from the cache if possible.
+        The rows are shared with the cache, so they mustn't be changed. If
+        no database connection is given, one is only opened if the rows
+        aren't cached. Anything that's going to be written back should be
+        read with ``cached=False``.
         """
 
-        # Get the plant from the database
-        plant = await db.call(
+        async def fetch() -> list[PlantLevelsRow]:
+            if db is None:
+                async with UnitOfWork.database() as new_db:
+                    return await cls._fetch_rows(new_db, user_id)
+            return await cls._fetch_rows(db, user_id)
+
+        if not cached or isinstance(db, vbu.DatabaseTransaction):
+            return await fetch()
+        return await cls.cache.get(user_id, fetch)
+
+    @staticmethod
+    async def _fetch_rows(
+            db: vbu.Database | vbu.DatabaseTransaction,
+            user_id: int) -> list[PlantLevelsRow]:
+        return await db.call(
             """
             SELECT
                 *
@@ -117,57 +203,135 @@ class UserPlant:
                 plant_levels
             WHERE
                 user_id = $1
-            AND
-                plant_name = $2
             """,
-            user_id, plant_name.strip(),
+            user_id,
             type=PlantLevelsRow,
         )
-        if not plant:
-            return None
 
-        # Return the plant object
-        return cls(**plant[0])
+    @classmethod
+    async def fetch_by_name(
+            cls,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            user_id: int,
+            plant_name: str,
+            *,
+            cached: bool = True) -> Optional[Self]:
+        """
+        Get a user's plant from the database.
+        """
+
+        # Plant names are case insensitive in the database (CITEXT)
+        plant_name = plant_name.strip().lower()
+        rows = await cls.fetch_rows_by_user_id(db, user_id, cached=cached)
+        for row in rows:
+            if row["plant_name"].lower() == plant_name:
+                return cls.from_row(row)
+        return None
 
     @classmethod
     async def fetch_all_by_user_id(
             cls,
-            db: vbu.Database,
-            user_id: int) -> list[Self]:
+            db: vbu.Database | vbu.DatabaseTransaction,
+            user_id: int,
+            *,
+            cached: bool = True) -> list[Self]:
         """
         Get a user's plant from the database.
         """
 
-        # Get the plant from the database
-        plant = await db.call(
+        return [
+            cls.from_row(p)
+            for p in await cls.fetch_rows_by_user_id(
+                db,
+                user_id,
+                cached=cached,
+            )
+        ]
+
+    @classmethod
+    async def fetch_many(
+            cls,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            user_ids: list[int]) -> dict[int, list[Self]]:
+        """
+        Get the plants for a lot of users at once. This always goes to the
+        database, so that batch jobs don't push everyone else out of the
+        cache.
+
+        Returns
+        -------
+        dict[int, list[Self]]
+            Each of the given user IDs, and their plants.
+        """
+
+        rows = await db.call(
             """
             SELECT
                 *
             FROM
                 plant_levels
             WHERE
-                user_id = $1
+                user_id = ANY($1::BIGINT[])
             """,
-            user_id,
+            user_ids,
             type=PlantLevelsRow,
         )
-        return [
-            cls(**p)
-            for p in plant
-        ]
+        plants: dict[int, list[Self]] = {i: [] for i in user_ids}
+        for row in rows:
+            plants[row["user_id"]].append(cls.from_row(row))
+        return plants
 
     async def update(
             self,
             db: vbu.Database | vbu.DatabaseTransaction,
             **kwargs):
         """
-        Update the plant in the database.
+        Update the plant in the database. Plants that have been saved before
+        only have the attributes that have changed since then written, which
+        keeps the statement and its parameters small. Postgres still writes
+        a new version of the whole row either way.
         """
 
+        previous_user_id = self.user_id
         for i, o in kwargs.items():
             setattr(self, i, o)
+        if previous_user_id != self.user_id:
+            self.cache.invalidate(previous_user_id)
+
+        # Insert the plant if it's new
+        if self._saved is None:
+            await self._insert(db)
+
+        # Otherwise just update whatever's changed
+        else:
+            changed = {
+                self.COLUMNS[i]: getattr(self, i)
+                for i, o in self._saved.items()
+                if getattr(self, i) != o
+            }
+            if not changed:
+                return
+            await db.call(
+                """
+                UPDATE
+                    plant_levels
+                SET
+                    {0}
+                WHERE
+                    id = $1
+                """.format(",\n                    ".join(
+                    f"{column} = ${index}"
+                    for index, column in enumerate(changed, start=2)
+                )),
+                self.id,
+                *changed.values(),
+            )
+        self._mark_saved()
+        self._dispatch_change()
 
-        # Update the plant in the database
+    async def _insert(
+            self,
+            db: vbu.Database | vbu.DatabaseTransaction) -> None:
         await db.call(
             """
             INSERT INTO
@@ -231,20 +395,236 @@ class UserPlant:
             self.immortal,
         )
 
+    async def water(
+            self,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            cooldown: timedelta,
+            water_time: Optional[dt] = None) -> bool:
+        """
+        Water the plant, adding one nourishment (up to its plant's maximum).
+        The cooldown and whether or not the plant is dead are checked by the
+        database rather than against this object, so that if the plant is
+        watered twice at once only one of them succeeds. A mortal plant's
+        age so far is counted towards its owner's max plant lifetime.
+
+        Returns
+        -------
+        bool
+            Whether or not the plant was watered.
+        """
+
+        water_time = water_time or dt.utcnow()
+        rows = await db.call(
+            """
+            WITH watered_plant AS (
+                UPDATE
+                    plant_levels
+                SET
+                    plant_nourishment = LEAST(plant_nourishment + 1, $4),
+                    last_water_time = $3,
+                    notification_sent = FALSE
+                WHERE
+                    id = $1
+                AND
+                    user_id = $2
+                AND
+                    last_water_time <= $5
+                AND
+                    (plant_nourishment >= 0 OR immortal = TRUE)
+                RETURNING
+                    *
+            ), lifetime AS (
+                INSERT INTO
+                    user_achievement_counts
+                    (
+                        user_id,
+                        max_plant_lifetime
+                    )
+                (
+                    SELECT
+                        user_id,
+                        $3 - plant_adoption_time
+                    FROM
+                        watered_plant
+                    WHERE
+                        immortal = FALSE
+                )
+                ON CONFLICT
+                    (user_id)
+                DO UPDATE
+                SET
+                    max_plant_lifetime = GREATEST(
+                        user_achievement_counts.max_plant_lifetime,
+                        excluded.max_plant_lifetime
+                    )
+            )
+            SELECT
+                plant_nourishment
+            FROM
+                watered_plant
+            """,
+            self.id,
+            self.user_id,
+            water_time,
+            self.plant.max_nourishment_level,
+            water_time - cooldown,
+        )
+        if not rows:
+            return False
+        self.nourishment = rows[0]["plant_nourishment"]
+        self.last_water_time = water_time
+        self.notification_sent = False
+        self._mark_saved()
+        self._dispatch_change()
+        return True
+
+    @classmethod
+    async def water_many(
+            cls,
+            db: vbu.Database | vbu.DatabaseTransaction,
+            plants: list[Self],
+            cooldown: timedelta,
+            water_time: Optional[dt] = None) -> list[Self]:
+        """
+        Water a batch of plants in a single statement, adding one nourishment
+        to each (up to their plant's maximum). As with :meth:`water`, the
+        cooldown and whether or not each plant is dead are checked by the
+        database, and the ages of the mortal plants are counted towards
+        their owners' max plant lifetimes.
+
+        Returns
+        -------
+        list[UserPlant]
+            The plants that were watered.
+        """
+
+        if not plants:
+            return []
+        water_time = water_time or dt.utcnow()
+        rows = await db.call(
+            """
+            WITH watered_plants AS (
+                UPDATE
+                    plant_levels
+                SET
+                    plant_nourishment = LEAST(
+                        plant_levels.plant_nourishment + 1,
+                        watered.max_nourishment
+                    ),
+                    last_water_time = $4,
+                    notification_sent = FALSE
+                FROM
+                    UNNEST($1::UUID[], $2::BIGINT[], $3::SMALLINT[])
+                        AS watered (id, user_id, max_nourishment)
+                WHERE
+                    plant_levels.id = watered.id
+                AND
+                    plant_levels.user_id = watered.user_id
+                AND
+                    plant_levels.last_water_time <= $5
+                AND
+                    (plant_levels.plant_nourishment >= 0 OR plant_levels.immortal = TRUE)
+                RETURNING
+                    plant_levels.*
+            ), lifetimes AS (
+                INSERT INTO
+                    user_achievement_counts
+                    (
+                        user_id,
+                        max_plant_lifetime
+                    )
+                (
+                    SELECT
+                        user_id,
+                        MAX($4 - plant_adoption_time)
+                    FROM
+                        watered_plants
+                    WHERE
+                        immortal = FALSE
+                    GROUP BY
+                        user_id
+                )
+                ON CONFLICT
+                    (user_id)
+                DO UPDATE
+                SET
+                    max_plant_lifetime = GREATEST(
+                        user_achievement_counts.max_plant_lifetime,
+                        excluded.max_plant_lifetime
+                    )
+            )
+            SELECT
+                id,
+                plant_nourishment
+            FROM
+                watered_plants
+            """,
+            [p.id for p in plants],
+            [p.user_id for p in plants],
+            [p.plant.max_nourishment_level for p in plants],
+            water_time,
+            water_time - cooldown,
+        )
+        nourishment = {str(r["id"]): r["plant_nourishment"] for r in rows}
+        watered = [p for p in plants if p.id in nourishment]
+        for plant in watered:
+            plant.nourishment = nourishment[plant.id]
+            plant.last_water_time = water_time
+            plant.notification_sent = False
+            plant._mark_saved()
+            plant._dispatch_change()
+        return watered
+
+    def _dispatch_change(self, deleted: bool = False) -> None:
+        self.cache.invalidate(self.user_id)
+        for listener in self.listeners:
+            listener(self, deleted)
+
     async def delete(
             self,
             db: vbu.Database):
         """
-        Delete the plant from the database.
+        Delete the plant from the database. If the plant was still alive, its
+        lifetime is counted towards its owner's max plant lifetime.
         """
 
         # Delete the plant from the database
         await db.call(
             """
-            DELETE FROM
-                plant_levels
-            WHERE
-                id = $1
+            WITH deleted_plant AS (
+                DELETE FROM
+                    plant_levels
+                WHERE
+                    id = $1
+                RETURNING
+                    *
+            )
+            INSERT INTO
+                user_achievement_counts
+                (
+                    user_id,
+                    max_plant_lifetime
+                )
+            (
+                SELECT
+                    user_id,
+                    TIMEZONE('UTC', NOW()) - plant_adoption_time
+                FROM
+                    deleted_plant
+                WHERE
+                    plant_nourishment > 0
+                AND
+                    immortal = FALSE
+            )
+            ON CONFLICT
+                (user_id)
+            DO UPDATE
+            SET
+                max_plant_lifetime = GREATEST(
+                    user_achievement_counts.max_plant_lifetime,
+                    excluded.max_plant_lifetime
+                )
             """,
             self.id,
         )
+        self._dispatch_change(deleted=True)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+import aiohttp
+
+from .cache import LRUCache
+
+
+__all__ = (
+    'PremiumCache',
+)
+
+
+class PremiumCache:
+    """
+    A cache of which users have a premium subscription, as reported by the
+    Voxel Fox portal. Concurrent lookups for the same user share a single
+    request, and all requests share one pooled HTTP session.
+
+    Attributes
+    -----------
+    url : str
+        The portal endpoint to check subscriptions against.
+    product_id : str
+        The ID of the subscription product.
+    ttl : float
+        How long (in seconds) to remember that a user has premium.
+    negative_ttl : float
+        How long (in seconds) to remember that a user doesn't have premium.
+        This is kept short so that new subscribers don't have to wait long,
+        and is also used when the portal can't be reached.
+    requests : int
+        The number of requests that have been made to the portal.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            product_id: str,
+            *,
+            ttl: float = 600,
+            negative_ttl: float = 60,
+            max_size: int = 100_000):
+        self.url = url
+        self.product_id = product_id
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache: LRUCache[int, tuple[bool, float]] = LRUCache(max_size)
+        self._pending: dict[int, asyncio.Future[bool]] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.requests: int = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20),
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Close the HTTP session.
+        """
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Forget the cached subscription state for a user, so that it's fetched
+        again the next time it's needed.
+        """
+
+        self._cache.pop(user_id)
+        self._pending.pop(user_id, None)
+
+    def clear(self) -> None:
+        """
+        Forget all cached subscription states.
+        """
+
+        self._cache.clear()
+
+    async def _fetch(self, user_id: int) -> bool:
+        params = {
+            "discord_user_id": user_id,
+            "product_id": self.product_id,
+        }
+        self.requests += 1
+        try:
+            async with self._get_session().get(self.url, params=params) as site:
+                data = await site.json()
+            return bool(data["result"])
+        except Exception:
+            return False
+
+    async def check(self, user_id: int) -> bool:
+        """
+        Check if a given user has a premium subscription.
+        """
+
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        # Wait on any request that's already being made for this user
+        pending = self._pending.get(user_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        task = asyncio.ensure_future(self._fetch(user_id))
+        self._pending[user_id] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            current = self._pending.get(user_id) is task
+            if current:
+                del self._pending[user_id]
+
+        # Don't cache the result if the user was invalidated mid-request
+        if current:
+            ttl = self.ttl if result else self.negative_ttl
+            self._cache.set(user_id, (result, time.monotonic() + ttl))
+        return result
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Get a dictionary of the counters for this cache.
+        """
+
+        return {
+            **self._cache.stats(),
+            "requests": self.requests,
+        }
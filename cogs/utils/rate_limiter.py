@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+__all__ = (
+    'RateLimiter',
+)
+
+
+class RateLimiter:
+    """
+    Spaces out async operations so that no more than ``rate`` of them start
+    each ``per`` seconds, allowing short bursts of up to ``rate`` at once.
+
+    Attributes
+    -----------
+    rate : float
+        The number of operations allowed in each period.
+    per : float
+        The length of the period, in seconds.
+    """
+
+    def __init__(self, rate: float, per: float = 1.0):
+        self.rate = rate
+        self.per = per
+        self._tokens: float = rate
+        self._updated: float = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.rate,
+            self._tokens + (now - self._updated) * self.rate / self.per,
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """
+        Wait until another operation is allowed to start.
+        """
+
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *args):
+        pass
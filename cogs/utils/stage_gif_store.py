@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+import threading
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from .models import Plant
+
+
+__all__ = (
+    'StageGifStore',
+)
+
+
+class StageGifStore:
+    """
+    A directory of pre-rendered gifs showing each of the display stages of a
+    plant, for a fixed set of pot hues. A manifest file in the directory
+    records which plant and pot each gif is for, as well as a fingerprint of
+    the plant's images so that stale gifs aren't served after a plant is
+    updated.
+
+    Everything here reads or writes files, so none of it should be called
+    from the event loop - run it in an executor instead. The manifest is
+    loaded the first time that it's needed.
+
+    Attributes
+    -----------
+    directory : str
+        The directory that the gifs are stored in.
+    hues : tuple[int, ...]
+        The pot hues that gifs are made for.
+    """
+
+    MANIFEST_FILENAME = "manifest.json"
+
+    def __init__(self, directory: str, hues: Iterable[int]):
+        self.directory = directory
+        self.hues = tuple(hues)
+        self._lock = threading.Lock()
+        self._fingerprints: dict[str, str] = {}
+        self._loaded_manifest: Optional[dict[str, dict[str, str]]] = None
+
+    @classmethod
+    def with_hue_count(cls, directory: str, hue_count: int):
+        """
+        Make a store whose pot hues are evenly spaced around the colour wheel.
+        """
+
+        hue_count = max(hue_count, 1)
+        return cls(
+            directory,
+            (round(i * 360 / hue_count) for i in range(hue_count)),
+        )
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, self.MANIFEST_FILENAME)
+
+    @property
+    def _manifest(self) -> dict[str, dict[str, str]]:
+        if self._loaded_manifest is None:
+            with self._lock:
+                if self._loaded_manifest is None:
+                    self._loaded_manifest = self._load_manifest()
+        return self._loaded_manifest
+
+    def _load_manifest(self) -> dict[str, dict[str, str]]:
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(self.manifest_path) as a:
+                return json.load(a)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_manifest(self) -> None:
+        temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as a:
+            json.dump(self._manifest, a, indent=4, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def get_fingerprint(self, plant: Plant) -> str:
+        """
+        Get a hash of everything that changes how a plant's stage gif looks.
+        """
+
+        if plant.name in self._fingerprints:
+            return self._fingerprints[plant.name]
+        files: list[tuple[str, int]] = []
+        for folder in ("alive", "dead"):
+            try:
+                entries = os.scandir(f"images/plants/{plant.name}/{folder}")
+            except FileNotFoundError:
+                continue
+            with entries:
+                files.extend(
+                    (f"{folder}/{i.name}", i.stat().st_mtime_ns)
+                    for i in entries
+                )
+        data = {
+            "nourishment_display_levels": plant.nourishment_display_levels,
+            "soil_hue": plant.soil_hue,
+            "files": sorted(files),
+        }
+        fingerprint = hashlib.sha1(
+            json.dumps(data, sort_keys=True).encode()
+        ).hexdigest()
+        self._fingerprints[plant.name] = fingerprint
+        return fingerprint
+
+    @staticmethod
+    def _get_key(plant: Plant, pot_type: str, pot_hue: int) -> str:
+        return f"{plant.name}/{pot_type}/{pot_hue}"
+
+    def read(
+            self,
+            plant: Plant,
+            pot_type: str,
+            pot_hue: int) -> Optional[bytes]:
+        """
+        Read a baked gif from the store.
+
+        Returns
+        -------
+        Optional[bytes]
+            The gif data, or ``None`` if there's no up-to-date gif stored for
+            the given plant and pot.
+        """
+
+        entry = self._manifest.get(self._get_key(plant, pot_type, pot_hue))
+        if entry is None:
+            return None
+        if entry["fingerprint"] != self.get_fingerprint(plant):
+            return None
+        try:
+            with open(os.path.join(self.directory, entry["filename"]), "rb") as a:
+                return a.read()
+        except FileNotFoundError:
+            return None
+
+    def write(
+            self,
+            plant: Plant,
+            pot_type: str,
+            pot_hue: int,
+            data: bytes) -> None:
+        """
+        Add a baked gif to the store.
+        """
+
+        filename = f"{plant.name}-{pot_type}-{pot_hue}.gif"
+        path = os.path.join(self.directory, filename)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as a:
+            a.write(data)
+        os.replace(temp_path, path)
+        manifest = self._manifest
+        with self._lock:
+            manifest[self._get_key(plant, pot_type, pot_hue)] = {
+                "filename": filename,
+                "fingerprint": self.get_fingerprint(plant),
+            }
+            self._save_manifest()
+
+    def get_missing(
+            self,
+            plants: Iterable[Plant],
+            pot_type: str) -> list[tuple[Plant, int]]:
+        """
+        Get the plant and pot hue pairs that don't have an up-to-date gif in
+        the store.
+        """
+
+        missing: list[tuple[Plant, int]] = []
+        for plant in plants:
+            fingerprint = self.get_fingerprint(plant)
+            for hue in self.hues:
+                entry = self._manifest.get(self._get_key(plant, pot_type, hue))
+                if entry is None or entry["fingerprint"] != fingerprint:
+                    missing.append((plant, hue))
+                elif not os.path.exists(os.path.join(self.directory, entry["filename"])):
+                    missing.append((plant, hue))
+        return missing
@@ -25,8 +25,42 @@ class _Plants(typing.TypedDict):
     guest_water_cooldown: dict
 
 
+class _Render(typing.TypedDict, total=False):
+    precompute_pot_sprites: bool
+    pot_sprite_cache_size: int
+    plant_image_cache_size: int
+    rendered_plant_cache_size: int
+    rendered_plant_directory: str
+    plant_sprite_cache_size: int
+    executor: typing.Literal["thread", "process"]
+    max_workers: int
+    max_queue_depth: int
+    herbiary_gif_directory: str
+    herbiary_gif_hue_count: int
+    bake_herbiary_gifs: bool
+    discord_image_encoding: typing.Literal["png", "png-fast", "png-indexed", "webp"]
+    website_image_encoding: typing.Literal["png", "png-fast", "png-indexed", "webp"]
+
+
+class _Notifications(typing.TypedDict, total=False):
+    enabled: bool
+    batch_size: int
+    max_queue_size: int
+    dms_per_second: float
+    concurrency: int
+
+
+class _Cache(typing.TypedDict, total=False):
+    user_state_ttl: float
+    user_state_cache_size: int
+    metrics_interval: float
+
+
 class _BotConfig(vbu.types.BotConfig):
     plants: _Plants
+    render: _Render
+    notifications: _Notifications
+    cache: _Cache
 
 
 class Bot(vbu.Bot):
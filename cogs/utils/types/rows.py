@@ -23,6 +23,7 @@ class UserSettingsRow(TypedDict):
     has_premium: bool
     premium_expiry_time: Optional[dt]
     premium_subscription_delete_url: str
+    last_vote_time: Optional[dt]
 
 
 class PlantLevelsRow(TypedDict):
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from discord.ext import vbu
+
+
+__all__ = (
+    'UnitOfWork',
+    'unit_of_work',
+)
+
+
+T = TypeVar("T")
+logger = logging.getLogger(__name__)
+
+
+class _MeteredDatabase(vbu.Database):
+    """
+    A database connection that adds the queries that it runs to the
+    counters of a unit of work.
+    """
+
+    unit_of_work: UnitOfWork
+
+    async def call(self, sql: str, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().call(sql, *args, **kwargs)
+        finally:
+            self.unit_of_work.record_query(time.perf_counter() - start)
+
+    async def execute_many(self, sql: str, *args):
+        start = time.perf_counter()
+        try:
+            return await super().execute_many(sql, *args)
+        finally:
+            self.unit_of_work.record_query(time.perf_counter() - start)
+
+
+_current_unit_of_work: ContextVar[Optional[UnitOfWork]]
+_current_unit_of_work = ContextVar("_current_unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """
+    Everything done with the database while handling a single interaction.
+    The first database connection that's opened with :meth:`database`
+    inside of a unit of work is checked out of the pool, and any that are
+    opened inside of that one get the same connection back, rather than
+    going back to the pool for each of them. Since asyncpg caches prepared
+    statements for each connection, the model queries that run more than
+    once are also only parsed and planned once.
+
+    The connection goes back to the pool as soon as the outermost
+    :meth:`database` block is left, so that it isn't held while the handler
+    waits on Discord or any other API between its database phases. It isn't
+    safe to use from more than one task at a time.
+
+    Attributes
+    -----------
+    name : str
+        The name of whatever the unit of work is for, as used to tag its
+        metrics.
+    queries : int
+        The number of queries that have been run.
+    query_time : float
+        The total time (in seconds) spent running queries.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.queries: int = 0
+        self.query_time: float = 0.0
+        self.is_active: bool = False
+        self._database: Optional[_MeteredDatabase] = None
+        self._open_blocks: int = 0
+        self._token = None
+
+    def record_query(self, duration: float) -> None:
+        """
+        Add a query to the counters for this unit of work.
+        """
+
+        self.queries += 1
+        self.query_time += duration
+
+    async def get_database(self) -> vbu.Database:
+        """
+        Get the connection for this unit of work, checking one out of the
+        pool if this is the first time it's needed.
+        """
+
+        if self._database is None:
+            database = _MeteredDatabase()
+            await database.__aenter__()
+            database.unit_of_work = self
+            self._database = database
+        return self._database
+
+    async def release(self) -> None:
+        """
+        Give this unit of work's connection back to the pool, if it has one.
+        The next :meth:`database` block will check out another.
+        """
+
+        if self._database is not None:
+            database, self._database = self._database, None
+            await database.disconnect()
+
+    @classmethod
+    @asynccontextmanager
+    async def database(cls) -> AsyncIterator[vbu.Database]:
+        """
+        Get a database connection. This is used in place of
+        ``vbu.Database()``, and gives the current unit of work's connection
+        if there is one, or a connection of its own if not.
+        """
+
+        current = _current_unit_of_work.get()
+        if current is not None and current.is_active:
+            current._open_blocks += 1
+            try:
+                yield await current.get_database()
+            finally:
+                current._open_blocks -= 1
+                if current._open_blocks == 0:
+                    await current.release()
+            return
+        async with vbu.Database() as db:
+            yield db
+
+    async def __aenter__(self) -> UnitOfWork:
+        self._token = _current_unit_of_work.set(self)
+        self.is_active = True
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.is_active = False
+        _current_unit_of_work.reset(self._token)  # pyright: ignore
+        await self.release()
+
+        # Don't let a problem with the metrics replace whatever the handler
+        # itself raised
+        try:
+            await self.report()
+        except Exception:
+            logger.exception(f"Failed to report unit of work {self.name}")
+
+    async def report(self) -> None:
+        """
+        Send the counters for this unit of work to statsd.
+        """
+
+        tags = {"handler": self.name}
+        async with vbu.Stats() as stats:
+            stats.histogram(
+                "interaction.db_queries",
+                value=self.queries,
+                tags=tags,
+            )
+            stats.timing(
+                "interaction.db_time",
+                value=int(self.query_time * 1_000),
+                tags=tags,
+            )
+
+
+def unit_of_work(
+        func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    Run a function inside of a unit of work, named after the function. If
+    there's already a unit of work running then that's used instead.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        current = _current_unit_of_work.get()
+        if current is not None and current.is_active:
+            return await func(*args, **kwargs)
+        async with UnitOfWork(func.__qualname__):
+            return await func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Generic, Optional, TypeVar,
+)
+
+from discord.ext import vbu
+
+from .cache import LRUCache
+
+
+__all__ = (
+    'UserStateCache',
+)
+
+
+V = TypeVar("V")
+
+
+# The users invalidated inside of the current transaction, as
+# (cache, user ID) pairs
+_pending_invalidations: ContextVar[Optional[list[tuple[Any, int]]]]
+_pending_invalidations = ContextVar("_pending_invalidations", default=None)
+
+
+class UserStateCache(Generic[V]):
+    """
+    A cache of some piece of state for each user (such as their plants)
+    that the models read through. Anything that changes the state should
+    call :meth:`invalidate` for that user once it's written, and writes
+    that happen inside of a transaction should open it with
+    :meth:`transaction` so that they're invalidated again once it's
+    committed. Entries also expire after a short time, since other
+    processes can change the database without telling us.
+
+    Attributes
+    -----------
+    ttl : float
+        How long (in seconds) an entry is used for before it's fetched
+        again.
+    invalidations : int
+        The number of times an entry has been invalidated.
+    """
+
+    def __init__(
+            self,
+            *,
+            ttl: float = 60,
+            max_size: int = 10_000):
+        self.ttl = ttl
+        self._cache: LRUCache[int, tuple[V, float]] = LRUCache(max_size)
+        self._fetching: dict[int, object] = {}
+        self.invalidations: int = 0
+
+    async def get(
+            self,
+            user_id: int,
+            fetch: Callable[[], Awaitable[V]]) -> V:
+        """
+        Get the state for a user, calling ``fetch`` to get it if it isn't
+        cached.
+        """
+
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        # Only cache what we fetch if the user wasn't invalidated while we
+        # were fetching it
+        token = object()
+        self._fetching[user_id] = token
+        try:
+            value = await fetch()
+        finally:
+            current = self._fetching.get(user_id) is token
+            if current:
+                del self._fetching[user_id]
+        if current:
+            self._cache.set(user_id, (value, time.monotonic() + self.ttl))
+        return value
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Forget the cached state for a user. Inside of :meth:`transaction`,
+        it's forgotten again once the transaction is over.
+        """
+
+        self._forget(user_id)
+        self.invalidations += 1
+        pending = _pending_invalidations.get()
+        if pending is not None:
+            pending.append((self, user_id))
+
+    def _forget(self, user_id: int) -> None:
+        self._cache.pop(user_id)
+        self._fetching.pop(user_id, None)
+
+    @staticmethod
+    @asynccontextmanager
+    async def transaction(
+            db: vbu.Database) -> AsyncIterator[vbu.DatabaseTransaction]:
+        """
+        Open a transaction on a database connection. Until the transaction
+        is committed, other tasks can still read (and cache) the old state
+        of anything that's invalidated inside of it, so those users are
+        invalidated again once it's over.
+        """
+
+        if _pending_invalidations.get() is not None:
+            async with db.transaction() as trans:
+                yield trans
+            return
+        pending: list[tuple[UserStateCache[Any], int]] = []
+        token = _pending_invalidations.set(pending)
+        try:
+            async with db.transaction() as trans:
+                yield trans
+        finally:
+            _pending_invalidations.reset(token)
+            for cache, user_id in pending:
+                cache._forget(user_id)
+
+    def clear(self) -> None:
+        """
+        Forget the cached state for all users.
+        """
+
+        self._cache.clear()
+        self._fetching.clear()
+
+    def resize(self, max_size: int) -> None:
+        """
+        Change the maximum number of users that are cached.
+        """
+
+        self._cache.resize(max_size)
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Get a dictionary of the counters for this cache.
+        """
+
+        return {
+            **self._cache.stats(),
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from .cache import LRUCache
+
+
+__all__ = (
+    'VoteCache',
+)
+
+
+class VoteCache:
+    """
+    A cache of which users have voted for the bot on Top.gg recently.
+    Concurrent lookups for the same user share a single request, and a
+    request carries on in the background even if whoever started it stops
+    waiting, so its result is there for next time.
+
+    Attributes
+    -----------
+    positive_ttl : float
+        How long (in seconds) to remember that Top.gg said a user has voted.
+        Top.gg doesn't say when the vote was made, so this is kept short
+        rather than assuming that the vote window has only just started.
+    negative_ttl : float
+        How long (in seconds) to remember that a user hasn't voted.
+    requests : int
+        The number of requests that have been made to Top.gg.
+    """
+
+    def __init__(
+            self,
+            *,
+            positive_ttl: float = 900,
+            negative_ttl: float = 300,
+            max_size: int = 100_000):
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._cache: LRUCache[int, tuple[bool, float]] = LRUCache(max_size)
+        self._pending: dict[int, asyncio.Future[bool]] = {}
+        self.requests: int = 0
+
+    async def check(
+            self,
+            user_id: int,
+            fetch: Callable[[int], Awaitable[bool]]) -> bool:
+        """
+        Check if a given user has voted, calling ``fetch`` with their ID if
+        it isn't cached.
+        """
+
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        # Wait on any request that's already being made for this user
+        pending = self._pending.get(user_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(user_id, fetch))
+            self._pending[user_id] = pending
+        return await asyncio.shield(pending)
+
+    async def _fetch(
+            self,
+            user_id: int,
+            fetch: Callable[[int], Awaitable[bool]]) -> bool:
+        self.requests += 1
+        try:
+            result = await fetch(user_id)
+        except Exception:
+            result = False
+        if self._pending.get(user_id) is asyncio.current_task():
+            del self._pending[user_id]
+            ttl = self.positive_ttl if result else self.negative_ttl
+            self._cache.set(user_id, (result, time.monotonic() + ttl))
+        return result
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Get a dictionary of the counters for this cache.
+        """
+
+        return {
+            **self._cache.stats(),
+            "requests": self.requests,
+        }
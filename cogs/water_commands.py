@@ -40,6 +40,10 @@ class WaterPlantMultiplier(TypedDict):
 
 class WaterCommands(vbu.Cog[utils.types.Bot]):
 
+    def __init__(self, bot):
+        super().__init__(bot)
+        self.vote_cache = utils.VoteCache()
+
     @property
     def topgg_url(self) -> Optional[str]:
         """
@@ -55,7 +59,33 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
             user_id: int) -> bool:
         """
         Returns whether or not the user with the given ID has
-        voted for the bot on Top.gg.
+        voted for the bot on Top.gg, using a cached result if there is one.
+
+        If a Top.gg webhook is set up then votes are already stored in the
+        database, so this doesn't make any requests at all.
+
+        Parameters
+        -----------
+        user_id: int
+            The ID of the user we want to check.
+
+        Returns
+        --------
+        bool
+            Whether or not the user voted for the bot.
+        """
+
+        api_keys = self.bot.config.get('bot_listing_api_keys', {})
+        if api_keys.get('topgg_webhook_authorization'):
+            return False
+        return await self.vote_cache.check(user_id, self.fetch_user_voted)
+
+    async def fetch_user_voted(
+            self,
+            user_id: int) -> bool:
+        """
+        Asks the Top.gg API whether or not the user with the given ID has
+        voted for the bot.
 
         Parameters
         -----------
@@ -132,20 +162,32 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
                 ephemeral=True,
             )
 
-        # Open db so we can get information
+        # Open db so we can get information - this goes straight to the
+        # database, since it decides what gets watered
         async with vbu.Database() as db:
 
             # Get all of the user's plants
             all_plants = await utils.UserPlant.fetch_all_by_user_id(
                 db,
                 ctx.author.id,
+                cached=False,
+            )
+            user_info = await utils.UserInfo.fetch_by_id(
+                db,
+                ctx.author.id,
+                cached=False,
             )
 
-        # See which ones we can water
+        # See which ones we can water - this has to match the checks in
+        # water_plant, since we're skipping it
         waterable: list[utils.UserPlant] = []
+        now = dt.utcnow()
         for plant in all_plants:
-            if plant.is_waterable:
-                waterable.append(plant)
+            if plant.is_dead:
+                continue
+            if plant.last_water_time + utils.constants.WATER_COOLDOWN > now:
+                continue
+            waterable.append(plant)
 
         # If there aren't any waterable ones, then just tell them we're
         # continuing on
@@ -157,17 +199,71 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
                 ephemeral=True,
             )
 
-        # Otherwise loop through and run the water command for each of the
-        # plants
-        embeds: list[discord.Embed] = []
+        # Defer so we can do some more intensive stuff now
+        await ctx.interaction.response.defer()
+
+        # Work out the experience for each of the plants - anything to do with
+        # the user only needs checking once
+        user_voted = await self.get_waterer_voted(user_info)
+        embeds: dict[str, discord.Embed] = {}
+        gained_experience: dict[str, int] = {}
         for plant in waterable:
-            if (e := await self.water_plant(ctx.interaction, plant)):
-                embeds.append(e)
-        while embeds:
+            original_gained_experience = plant.plant.get_experience()
+            multipliers = self.get_water_multipliers(
+                plant,
+                user_info,
+                utils.constants.WATER_COOLDOWN,
+                user_voted,
+            )
+            gained_experience[plant.id] = self.apply_multipliers(
+                original_gained_experience,
+                multipliers,
+            )
+            embeds[plant.id] = self.get_water_embed(
+                plant,
+                original_gained_experience,
+                gained_experience[plant.id],
+                multipliers,
+            )
+
+        # Update the database in one go - the database decides which of the
+        # plants can actually be watered, so only those are counted
+        async with vbu.Database() as db:
+            async with utils.UserStateCache.transaction(db) as trans:
+                watered = await utils.UserPlant.water_many(
+                    trans,
+                    waterable,
+                    utils.constants.WATER_COOLDOWN,
+                    now,
+                )
+                if watered:
+                    user_info.experience = await utils.UserInfo.add_experience(
+                        trans,
+                        user_info.user_id,
+                        sum(gained_experience[p.id] for p in watered),
+                    )
+                    await utils.update_achievement_count(
+                        trans,
+                        ctx.author.id,
+                        utils.Achievement.waters,
+                        len(watered),
+                    )
+
+        # See if they were all watered somewhere else in the meantime
+        if not watered:
+            return await ctx.interaction.followup.send(
+                _(
+                    "You don't have any plants that need watering right now!"
+                ),
+            )
+
+        # And tell the user
+        watered_embeds = [embeds[p.id] for p in watered]
+        while watered_embeds:
             await ctx.interaction.followup.send(
-                embeds=embeds[:10],
+                embeds=watered_embeds[:10],
             )
-            embeds = embeds[10:]
+            watered_embeds = watered_embeds[10:]
 
     @commands.command(
         application_command_meta=commands.ApplicationCommandMeta(
@@ -276,6 +372,7 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
         if (embed := await self.water_plant(ctx.interaction, plant)):
             return await ctx.interaction.followup.send(embed=embed)
 
+    @utils.unit_of_work
     @vbu.i18n("flower")
     async def water_plant(
             self,
@@ -298,7 +395,7 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
         target: discord.User = user or waterer
 
         # Open db to get some user information
-        async with vbu.Database() as db:
+        async with utils.UnitOfWork.database() as db:
 
             # Get a plant object associated with the plant name they gave
             user_plant: utils.UserPlant | None = None
@@ -307,6 +404,7 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
                     db,
                     target.id,
                     plant,
+                    cached=False,
                 )
             else:
                 user_plant = plant
@@ -316,10 +414,18 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
             waterer_info: utils.UserInfo | None = None
             target_info: utils.UserInfo | None = None
             if user_plant is not None:
-                waterer_info = await utils.UserInfo.fetch_by_id(db, waterer.id)
+                waterer_info = await utils.UserInfo.fetch_by_id(
+                    db,
+                    waterer.id,
+                    cached=False,
+                )
                 target_info = waterer_info
                 if waterer != target:
-                    target_info = await utils.UserInfo.fetch_by_id(db, target.id)
+                    target_info = await utils.UserInfo.fetch_by_id(
+                        db,
+                        target.id,
+                        cached=False,
+                    )
 
         # Make sure we have a plant that exists
         if user_plant is None:
@@ -396,9 +502,83 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
         if not interaction.response.is_done():
             await interaction.response.defer()
 
-        # Set up original original data before we morph it with calculations
+        # Work out how much experience they get
         original_gained_experience: int = user_plant.plant.get_experience()
-        gained_experience: int = original_gained_experience
+        multipliers = self.get_water_multipliers(
+            user_plant,
+            waterer_info,
+            cooldown,
+            await self.get_waterer_voted(waterer_info),
+        )
+        gained_experience = self.apply_multipliers(
+            original_gained_experience,
+            multipliers,
+        )
+
+        # Update the database - the cooldown is checked again as part of
+        # the update, in case the plant was watered since we looked at it
+        water_time = dt.utcnow()
+        async with utils.UnitOfWork.database() as db:
+            async with utils.UserStateCache.transaction(db) as trans:
+                watered = await user_plant.water(trans, cooldown, water_time)
+                if watered:
+                    waterer_info.experience = await utils.UserInfo.add_experience(
+                        trans,
+                        waterer_info.user_id,
+                        gained_experience,
+                    )
+                    await utils.update_achievement_count(
+                        trans,
+                        waterer.id,
+                        utils.Achievement.waters,
+                    )
+        if not watered:
+            wait_time = discord.utils.format_dt(water_time + cooldown, "R")
+            await interaction.followup.send(
+                _(
+                    "You can't water that plant yet! Please try again "
+                    "{wait_time}."
+                ).format(wait_time=wait_time),
+                ephemeral=True,
+            )
+            return None
+
+        # Send the response
+        return self.get_water_embed(
+            user_plant,
+            original_gained_experience,
+            gained_experience,
+            multipliers,
+        )
+
+    async def get_waterer_voted(
+            self,
+            waterer_info: utils.UserInfo) -> bool:
+        """
+        Work out whether the person watering a plant has voted for the bot,
+        giving up on the Top.gg API if it takes too long.
+        """
+
+        if waterer_info.has_voted:
+            return True
+        try:
+            return await asyncio.wait_for(
+                self.get_user_voted(waterer_info.user_id),
+                timeout=2.0,
+            )
+        except asyncio.TimeoutError:
+            return False
+
+    def get_water_multipliers(
+            self,
+            user_plant: utils.UserPlant,
+            waterer_info: utils.UserInfo,
+            cooldown: timedelta,
+            user_voted: bool) -> list[WaterPlantMultiplier]:
+        """
+        Get the experience multipliers that apply to watering a given plant.
+        """
+
         multipliers: list[WaterPlantMultiplier] = []
 
         # Plant multiplier - premium subscriber
@@ -440,15 +620,7 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
             )
 
         # Plant multiplier - voted on Topgg
-        user_voted_api_request: bool = False
-        try:
-            user_voted_api_request = await asyncio.wait_for(
-                self.get_user_voted(interaction.user.id),
-                timeout=2.0,
-            )
-        except asyncio.TimeoutError:
-            pass
-        if user_voted_api_request:
+        if user_voted:
             multipliers.append(
                 {
                     "multiplier": 1.1,
@@ -477,33 +649,31 @@ class WaterCommands(vbu.Cog[utils.types.Bot]):
                 },
             )
 
-        # Apply multipliers
-        gained_experience_float: float = gained_experience
+        return multipliers
+
+    @staticmethod
+    def apply_multipliers(
+            experience: int,
+            multipliers: list[WaterPlantMultiplier]) -> int:
+        """
+        Apply a list of multipliers to an amount of experience.
+        """
+
+        experience_float: float = experience
         for multiplier in multipliers:
-            gained_experience_float *= multiplier["multiplier"]
-        gained_experience = int(gained_experience_float)
+            experience_float *= multiplier["multiplier"]
+        return int(experience_float)
 
-        # Update the database
-        async with vbu.Database() as db:
-            await user_plant.update(
-                db,
-                nourishment=min(
-                    user_plant.nourishment + 1,
-                    user_plant.plant.max_nourishment_level,
-                ),
-                last_water_time=dt.utcnow(),
-            )
-            await waterer_info.update(
-                db,
-                experience=waterer_info.experience + gained_experience,
-            )
-            await utils.update_achievement_count(
-                db,
-                waterer.id,
-                utils.Achievement.waters,
-            )
+    def get_water_embed(
+            self,
+            user_plant: utils.UserPlant,
+            original_gained_experience: int,
+            gained_experience: int,
+            multipliers: list[WaterPlantMultiplier]) -> discord.Embed:
+        """
+        Make the embed telling a user that their plant was watered.
+        """
 
-        # Send the response
         embed = vbu.Embed(use_random_colour=True)
         embed.title=_("Watered {plant_name}!").format(
             plant_name=user_plant.name,
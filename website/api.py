@@ -28,6 +28,13 @@ async def get_plant(request:Request):
     except (ValueError, AssertionError):
         return json_response({"error": "No plant name provided"}, status=400)
 
+    # Get the image scale - clients that can upscale pixel art themselves can ask for 1
+    try:
+        scale = int(request.query.get('scale', 5))
+        assert 1 <= scale <= 10
+    except (ValueError, AssertionError):
+        return json_response({"error": "Invalid scale provided."}, status=400)
+
     # Grab database information
     async with request.app['database']() as db:
         plant_rows = await db("SELECT * FROM plant_levels WHERE user_id=$1 AND LOWER(plant_name)=LOWER($2) ORDER BY plant_name ASC", user_id, plant_name)
@@ -38,9 +45,7 @@ async def get_plant(request:Request):
     data = [dict(i) for i in plant_rows][0]
     display_utils = request.app['bots']['bot'].get_cog("PlantDisplayUtils")
     plant_display_dict = display_utils.get_display_data(data, user_id=user_id)
-    display_data = display_utils.get_plant_image(**plant_display_dict)
-    cropped_display_data = display_utils.crop_image_to_content(display_data)
-    image_bytes = display_utils.image_to_bytes(cropped_display_data)
+    image_bytes = await display_utils.render_plant(**plant_display_dict, scale=scale)
     data['image_data'] = base64.b64encode(image_bytes.read()).decode()
 
     return json_response({"error": "", "data": {x: y if not isinstance(y, dt) else y.timestamp() for x, y in data.items()}})
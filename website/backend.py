@@ -1,3 +1,4 @@
+import hmac
 from datetime import datetime as dt
 
 import aiohttp
@@ -126,12 +127,7 @@ async def purchase_complete(request: Request):
         if data['refund']:
             experience = -experience
         async with request.app['database']() as db:
-            await db(
-                """INSERT INTO user_settings (user_id, user_experience) VALUES ($1, $2)
-                ON CONFLICT (user_id) DO UPDATE SET
-                user_experience=user_settings.user_experience+excluded.user_experience""",
-                user_id, experience,
-            )
+            await utils.UserInfo.add_experience(db, user_id, experience)
 
         # Send DMs
         if experience > 0:
@@ -166,6 +162,9 @@ async def purchase_complete(request: Request):
                 user_id, not bool(expiry_time), expiry_time, premium_subscription_delete_url,
             )
 
+        # Make sure the subscription change is picked up straight away
+        utils.UserInfo.premium_cache.invalidate(user_id)
+
         # Work out what to send to Discord
         if data['refund']:
             discord_channel_send_text = f"<@{user_id}>'s subscription to Flower Premium was refunded."
@@ -187,6 +186,45 @@ async def purchase_complete(request: Request):
     return Response(status=200)
 
 
+@routes.post('/webhooks/topgg/vote')
+async def topgg_vote(request: Request):
+    """
+    Handles incoming vote webhooks from Top.gg, so that votes don't need to
+    be checked against their API when a user waters their plants.
+    """
+
+    # Verify the header
+    bot = request.app['bots']['bot']
+    authorization = bot.config.get('bot_listing_api_keys', {}).get('topgg_webhook_authorization')
+    given_authorization = request.headers.get('Authorization', '').strip()
+    if not authorization or not hmac.compare_digest(given_authorization.encode(), authorization.encode()):
+        return Response(status=401)
+
+    # Read the vote
+    try:
+        data = await request.json()
+        vote_type = data.get('type')
+        user_id = int(data['user'])
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return Response(status=400)
+
+    # Test votes from the Top.gg dashboard shouldn't count
+    if vote_type == 'test':
+        return Response(status=200)
+
+    # Store the vote
+    async with request.app['database']() as db:
+        await db(
+            """INSERT INTO user_settings (user_id, last_vote_time) VALUES ($1, TIMEZONE('UTC', NOW()))
+            ON CONFLICT (user_id) DO UPDATE SET last_vote_time=excluded.last_vote_time""",
+            user_id,
+        )
+    utils.UserInfo.cache.invalidate(user_id)
+
+    # And done
+    return Response(status=200)
+
+
 @routes.post('/unsubscribe')
 async def unsubscribe(request: Request):
     """
@@ -245,6 +283,7 @@ async def set_pot_hue(request: Request):
             ON CONFLICT (user_id) DO UPDATE SET plant_pot_hue=excluded.plant_pot_hue""",
             user_id, ((int(data['hue']) + 28) % 360),
         )
+    utils.UserInfo.cache.invalidate(user_id)
 
     # And done
     return json_response({"message": "Pot hue updated!"})
@@ -55,9 +55,11 @@ async def flowers(request:Request):
     display_utils = request.app['bots']['bot'].get_cog("PlantDisplayUtils")
     for data in plants:
         plant_display_dict = display_utils.get_display_data(data, user_id=data['user_id'])
-        display_data = display_utils.get_plant_image(**plant_display_dict)
-        cropped_display_data = display_utils.crop_image_to_content(display_data)
-        image_bytes = display_utils.image_to_bytes(cropped_display_data)
+        image_bytes = await display_utils.render_plant(
+            **plant_display_dict,
+            scale=1,
+            encoding=display_utils.website_image_encoder.name,
+        )
         data['image_data'] = base64.b64encode(image_bytes.read()).decode()
 
     # Fix up the inventory dictionary
@@ -86,6 +88,7 @@ async def flowers(request:Request):
     return {
         'user': dict(user_rows[0]),
         'plants': plants,
+        'image_type': display_utils.website_image_encoder.mime_type,
         'inventory': inventory,
         'base_water_timeout': base_water_timeout.total_seconds(),
         'user_has_premium': user_has_premium,
@@ -143,17 +146,21 @@ async def herbiary(request:Request):
         for plant in output:
             plant_data = {'plant_type': plant.name, 'plant_nourishment': plant.max_nourishment_level, 'plant_pot_hue': random.randint(0, 359)}
             plant_display_dict = display_utils.get_display_data(plant_data)
-            display_data = display_utils.get_plant_image(**plant_display_dict)
-            cropped_display_data = display_utils.crop_image_to_content(display_data)
-            image_bytes = display_utils.image_to_bytes(cropped_display_data)
+            image_bytes = await display_utils.render_plant(
+                **plant_display_dict,
+                scale=1,
+                encoding=display_utils.website_image_encoder.name,
+            )
             plant.image_data = base64.b64encode(image_bytes.read()).decode()
         generated_herbiary = output
         generated_herbiary_lifetime = -1
     generated_herbiary_lifetime += 1
     generated_herbiary.sort(key=lambda p: p.name)
+    display_utils = request.app['bots']['bot'].get_cog("PlantDisplayUtils")
 
     return {
         'plants': generated_herbiary,
+        'image_type': display_utils.website_image_encoder.mime_type,
     }
 
 